@@ -1,32 +1,59 @@
-from fontTools.merge.util import first
-from mpl_toolkits.mplot3d.proj3d import transform
+import time
+from array import array
+from collections import Counter
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from . import metrics
+    from .memo_cache import memoized
+    from .suffix_array import build_suffix_array
+except ImportError:
+    import metrics
+    from memo_cache import memoized
+    from suffix_array import build_suffix_array
 
 
 class BWT:
-    def __init__(self, text: str):
-        self.text:str = text + '$'
+    def __init__(self, text: str, method: str = "sais"):
+        # Works on str or bytes, the appended '$' sorts before every other character
+        self.text:str = text + ('$' if isinstance(text, str) else b'$')
+        self.method: str = method  # Suffix array engine, see build_suffix_array
         self.last_column:str = ""
         self.first_column:str = ""
-        self.suffix_array:list[int] = []
+        self.suffix_array: array = array('i')
+        self.primary_index: Optional[int] = None  # Row of the text itself, its last column holds the sentinel
         self.rank: dict[str, int] = {}
 
+    @metrics.timed("bwt.transform", argument=None)
+    @memoized(content="text", parameters=("method",),
+              state=("suffix_array", "primary_index", "first_column", "last_column"))
     def transform(self):
-        rotations: (list[(int, str)]) = []
         text = self.text
-        # generate all possible rotations
-        for i in range(len(text)):
-            rotations.append((i, text[i:] + text[:i]))
-
-        # Sort the rotations lexicographically
-        rotations.sort(key=lambda x: x[1])
-        for i, rotation in rotations:
-            self.suffix_array.append(i)
-
-        first_column = ''.join(rotation[0] for _, rotation in rotations)
-        self.first_column = first_column
-
-        last_column = ''.join(rotation[-1] for _ , rotation in rotations)
-        self.last_column = last_column
+        recorder = metrics.active
+        if recorder is not None:
+            start = time.perf_counter()
+        # Sorting the rotations of text + '$' is sorting its suffixes, the '$' suffix comes first
+        self.suffix_array = array('i', [len(text) - 1]) + build_suffix_array(text[:-1], self.method)
+        self.primary_index = self.suffix_array.index(0)
+        if recorder is not None:
+            sorted_at = time.perf_counter()
+            recorder.add_time("bwt.sort", sorted_at - start)
+
+        # Column characters are looked up through the suffix array, the last column is the text shifted by one
+        rotated = text[-1:] + text[:-1]
+        if isinstance(text, str):
+            self.first_column = ''.join(map(text.__getitem__, self.suffix_array))
+            self.last_column = ''.join(map(rotated.__getitem__, self.suffix_array))
+        else:
+            self.first_column = bytes(map(text.__getitem__, self.suffix_array))
+            self.last_column = bytes(map(rotated.__getitem__, self.suffix_array))
+        if recorder is not None:
+            recorder.add_time("bwt.columns", time.perf_counter() - sorted_at)
         return self.last_column
 
     def rank(self) -> dict[str, int]:
@@ -44,25 +71,62 @@ class BWT:
         return rank_dict
 
     def lf_mapping(self):
-        # Start from the sentinel character '$'
-        index = self.last_column.index('$')
-        result = []
-
-        # Follow the LF mapping for length of text iterations
-        for _ in range(len(self.text)):
-            current = self.last_column[index]
-            result.append(current)
-            # Get count of current character before index
-            rank_in_last = self.last_column[:index].count(current)
-            # Find first occurrence of current char in first column
-            first_occ = self.first_column.find(current)
-            # Update index by adding rank to first occurrence
-            index = first_occ + rank_in_last
-
-        # Remove sentinel and join characters
-        return ''.join(result[1:])[::-1]
-
-
+        """Inverts the transform from the last column alone."""
+        return BWT.inverse(self.last_column, self.primary_index)
+
+    @staticmethod
+    def lf_array(last_column, primary_index: int) -> array:
+        """LF[i] is the row of the rotation that starts one character before row i's rotation.
+
+        The character at primary_index is the sentinel and sorts before everything else.
+        """
+        n = len(last_column)
+        if np is not None and n:
+            # The stable sort of the last column is the first column, LF is its inverse permutation
+            if isinstance(last_column, str):
+                keys = np.fromiter(map(ord, last_column), dtype=np.int64, count=n)
+            else:
+                keys = np.frombuffer(bytes(last_column), dtype=np.uint8).astype(np.int64)
+            keys[primary_index] = -1
+            lf = np.empty(n, dtype=np.int32)
+            lf[np.argsort(keys, kind='stable')] = np.arange(n, dtype=np.int32)
+            return array('i', lf.tobytes())
+
+        # C table: first row of every character, row 0 belongs to the sentinel
+        counts = Counter(last_column)
+        counts[last_column[primary_index]] -= 1
+        first_row = {}
+        row = 1
+        for char in sorted(counts):
+            first_row[char] = row
+            row += counts[char]
+
+        lf = array('i', bytes(4 * n))
+        for i, char in enumerate(last_column):
+            if i != primary_index:
+                lf[i] = first_row[char]
+                first_row[char] += 1
+        return lf
+
+    @staticmethod
+    @metrics.timed("bwt.inverse", argument=None)
+    def inverse(last_column, primary_index: Optional[int] = None):
+        """Rebuilds the text (without the sentinel) from the last column and the sentinel's row."""
+        if primary_index is None:
+            primary_index = last_column.index('$' if isinstance(last_column, str) else b'$')
+        lf = BWT.lf_array(last_column, primary_index)
+
+        # Row 0 starts with the sentinel, so its last character is the end of the text
+        n = len(last_column) - 1
+        output = bytearray(n) if not isinstance(last_column, str) else [''] * n
+        index = 0
+        for position in range(n - 1, -1, -1):
+            output[position] = last_column[index]
+            index = lf[index]
+
+        if isinstance(output, list):
+            return ''.join(output)
+        return bytes(output)
 
 
 if __name__ == "__main__":
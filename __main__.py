@@ -0,0 +1,202 @@
+"""Command-line front end for the codecs and the substring search engines.
+
+    python -m coding_it_out compress [-c lz77|bwt] [-j N] [--stats] INPUT [-o OUTPUT]
+    python -m coding_it_out decompress [-j N] [--stats] INPUT [-o OUTPUT]
+    python -m coding_it_out search [-a z|bwt] [-j N] [--count] [--stats] INPUT PATTERN [PATTERN ...]
+Inputs are memory mapped ('-' reads standard input), output goes to OUTPUT or standard output.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    from .block_sort import BlockSortCompressor
+    from .container import LZ77Container, SeekableLZ77Container
+    from .fm_index import FMIndex
+    from .lz77 import LZ77
+    from .z_algorithm import MultiPatternMatcher, ZAlgorithm
+except ImportError:
+    from block_sort import BlockSortCompressor
+    from container import LZ77Container, SeekableLZ77Container
+    from fm_index import FMIndex
+    from lz77 import LZ77
+    from z_algorithm import MultiPatternMatcher, ZAlgorithm
+
+# Output is collected in buffers this large before it reaches the file
+OUTPUT_BUFFER: int = 1 << 20
+# Text per worker for search -j, each shard also reads the longest pattern length - 1 bytes into the next one
+SEARCH_SHARD_SIZE: int = 1 << 22
+
+
+@contextmanager
+def _map_input(path: str):
+    """Yields the contents of path as a read-only mmap, or bytes for standard input and empty files."""
+    if path == "-":
+        yield sys.stdin.buffer.read()
+        return
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _open_output(path: str):
+    # Standard output is wrapped too, so it gets the same large buffer, and left open afterwards
+    if path is None or path == "-":
+        sys.stdout.flush()
+        return open(sys.stdout.fileno(), 'wb', buffering=OUTPUT_BUFFER, closefd=False)
+    return open(path, 'wb', buffering=OUTPUT_BUFFER)
+
+
+def _write(output, data):
+    # Large results go out in OUTPUT_BUFFER pieces straight from a view, without copying them again
+    view = memoryview(data)
+    for start in range(0, len(view), OUTPUT_BUFFER):
+        output.write(view[start:start + OUTPUT_BUFFER])
+
+
+def _report(command: str, read: int, written: int, seconds: float):
+    rate = read / seconds / 1e6 if seconds else float("inf")
+    ratio = f", ratio {written / read:.4f}" if read and command != "search" else ""
+    print(f"{command}: {read:,} bytes in, {written:,} bytes out, {seconds:.3f} s, {rate:.2f} MB/s{ratio}",
+          file=sys.stderr)
+
+
+def compress(data, codec: str = "lz77", workers: int = 1, block_size: int = 1 << 18,
+             window: int = 4096, lookahead: int = 32) -> bytes:
+    """Compresses data with the LZ77 container or the BWT block sorter, blocks in parallel with workers > 1."""
+    if codec == "lz77":
+        return LZ77Container(LZ77(window, lookahead), workers).compress(data)
+    if codec == "bwt":
+        return BlockSortCompressor(block_size, workers).compress(data)
+    raise ValueError(f"Unknown codec {codec!r}, expected lz77 or bwt")
+
+
+def decompress(blob, workers: int = 1) -> bytes:
+    """Decompresses any container this package writes, recognised by its magic."""
+    magic = bytes(blob[:4])
+    if magic == LZ77Container.MAGIC:
+        return LZ77Container.decompress(blob)
+    if magic == SeekableLZ77Container.MAGIC:
+        return SeekableLZ77Container.decompress(blob)
+    if magic == BlockSortCompressor.MAGIC:
+        return BlockSortCompressor(workers=workers).decompress(blob)
+    raise ValueError("Input is not a compressed file")
+
+
+def search(text, patterns: list, algorithm: str = "z", workers: int = 1,
+           shard_size: int = SEARCH_SHARD_SIZE) -> dict:
+    """Maps every pattern to its sorted match positions in text, with the Z algorithm or an FM-index of the BWT.
+
+    With workers > 1 the text is cut into shards searched in a process pool, the BWT engine indexes every
+    shard on its own.
+    """
+    if any(not pattern for pattern in patterns):
+        raise ValueError("Patterns must not be empty")
+    if algorithm == "z":
+        if len(patterns) == 1 and workers <= 1:
+            return {patterns[0]: ZAlgorithm.compile(patterns[0]).findall(text)}
+        return MultiPatternMatcher(patterns).search(text, workers, shard_size)
+    if algorithm != "bwt":
+        raise ValueError(f"Unknown search algorithm {algorithm!r}, expected z or bwt")
+
+    overlap = max(map(len, patterns)) - 1
+    if workers <= 1 or len(text) <= shard_size:
+        return _fm_index_shard(bytes(text), patterns, len(text))
+    starts = range(0, len(text), shard_size)
+    pieces = [text[start:start + shard_size + overlap] for start in starts]
+    stops = [min(shard_size, len(text) - start) for start in starts]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        shards = executor.map(_fm_index_shard, pieces, [patterns] * len(pieces), stops)
+        result = {pattern: [] for pattern in patterns}
+        for start, matches in zip(starts, shards):
+            for pattern, positions in matches.items():
+                result[pattern].extend(start + position for position in positions)
+    return result
+
+
+def _fm_index_shard(text: bytes, patterns: list, stop: int) -> dict:
+    # Matches starting at or after stop belong to the next shard
+    index = FMIndex.from_text(text)
+    return {pattern: [position for position in index.locate(pattern) if position < stop] for pattern in patterns}
+
+
+def _run(arguments: argparse.Namespace, data) -> bytes:
+    # Output of one parsed command for the input data
+    if arguments.command == "compress":
+        return compress(data, arguments.codec, arguments.jobs, arguments.block_size,
+                        arguments.window, arguments.lookahead)
+    if arguments.command == "decompress":
+        return decompress(data, arguments.jobs)
+    patterns = [os.fsencode(pattern) for pattern in arguments.patterns]
+    matches = search(data, patterns, arguments.algorithm, arguments.jobs)
+    # Offsets alone for one pattern, tab separated offset and pattern for several
+    if arguments.count:
+        lines = [b"%d\t%s\n" % (len(positions), pattern) for pattern, positions in matches.items()]
+    elif len(patterns) == 1:
+        lines = [b"%d\n" % position for position in matches[patterns[0]]]
+    else:
+        lines = [b"%d\t%s\n" % (position, pattern)
+                 for pattern, positions in matches.items() for position in positions]
+    return b"".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m coding_it_out", description=__doc__.splitlines()[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for block-parallel work")
+    common.add_argument("--stats", action="store_true", help="report sizes and throughput on standard error")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compress_parser = commands.add_parser("compress", parents=[common], help="compress a file")
+    compress_parser.add_argument("input")
+    compress_parser.add_argument("-o", "--output")
+    compress_parser.add_argument("-c", "--codec", choices=("lz77", "bwt"), default="lz77")
+    compress_parser.add_argument("--block-size", type=int, default=1 << 18, help="bwt block size in bytes")
+    compress_parser.add_argument("--window", type=int, default=4096, help="lz77 window in bytes")
+    compress_parser.add_argument("--lookahead", type=int, default=32, help="lz77 longest match")
+
+    decompress_parser = commands.add_parser("decompress", parents=[common], help="decompress a file")
+    decompress_parser.add_argument("input")
+    decompress_parser.add_argument("-o", "--output")
+
+    search_parser = commands.add_parser("search", parents=[common], help="find every occurrence of patterns")
+    search_parser.add_argument("input")
+    search_parser.add_argument("patterns", nargs="+")
+    search_parser.add_argument("-a", "--algorithm", choices=("z", "bwt"), default="z")
+    search_parser.add_argument("--count", action="store_true", help="print match counts instead of offsets")
+    search_parser.add_argument("-o", "--output")
+    arguments = parser.parse_args(argv)
+    if arguments.jobs < 1:
+        parser.error("-j must be at least 1")
+
+    start = time.perf_counter()
+    failure = None
+    try:
+        with _map_input(arguments.input) as data, _open_output(arguments.output) as output:
+            try:
+                result = _run(arguments, data)
+                _write(output, result)
+                read = len(data)
+            except (OSError, ValueError, struct.error) as error:
+                # Only the message is kept, the traceback would hold views into data past the mmap's close
+                failure = str(error)
+    except OSError as error:
+        failure = str(error)
+    if failure is not None:
+        print(f"{parser.prog} {arguments.command}: {failure}", file=sys.stderr)
+        return 1
+    if arguments.stats:
+        _report(arguments.command, read, len(result), time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import asyncio
+import struct
+from collections import deque
+from concurrent.futures import Executor
+from typing import Optional
+
+try:
+    from .block_sort import compress_block, decompress_block
+    from .container import LZ77Container
+    from .lz77 import LZ77
+except ImportError:
+    from block_sort import compress_block, decompress_block
+    from container import LZ77Container
+    from lz77 import LZ77
+
+# Stream layout: magic, codec id, then blocks as a 4 byte size and the codec's payload, ended by a zero size
+MAGIC: bytes = b"ASYC"
+BLOCK_SIZE = struct.Struct(">I")
+DEFAULT_BLOCK_SIZE: int = 1 << 16
+DEFAULT_IN_FLIGHT: int = 4
+# Window and lookahead of the lz77 codec, the container header records them for decompression
+LZ77_WINDOW: int = 4096
+LZ77_LOOKAHEAD: int = 32
+
+
+def _lz77_compress(block: bytes) -> bytes:
+    return LZ77Container(LZ77(LZ77_WINDOW, LZ77_LOOKAHEAD)).compress(block)
+
+
+def _lz77_decompress(payload: bytes) -> bytes:
+    return LZ77Container.decompress(payload)
+
+
+# Codec name -> (id stored in the stream, compress, decompress), module level so process pools can pickle them
+CODECS: dict = {
+    "lz77": (1, _lz77_compress, _lz77_decompress),
+    "block_sort": (2, compress_block, decompress_block),
+}
+
+
+async def _read_block(reader: asyncio.StreamReader, size: int) -> bytes:
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+
+
+async def _pipeline(blocks, function, writer: asyncio.StreamWriter, executor: Optional[Executor],
+                    max_in_flight: int, framed: bool) -> int:
+    # Runs function on every block in the executor, at most max_in_flight at once, writing results in order
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    written = 0
+
+    async def write_oldest():
+        nonlocal written
+        result = await pending.popleft()
+        if framed:
+            writer.write(BLOCK_SIZE.pack(len(result)))
+        writer.write(result)
+        await writer.drain()
+        written += len(result)
+
+    async for block in blocks:
+        pending.append(loop.run_in_executor(executor, function, block))
+        if len(pending) >= max_in_flight:
+            await write_oldest()
+    while pending:
+        await write_oldest()
+    return written
+
+
+async def compress(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, codec: str = "lz77",
+                   block_size: int = DEFAULT_BLOCK_SIZE, executor: Optional[Executor] = None,
+                   max_in_flight: int = DEFAULT_IN_FLIGHT) -> int:
+    """Compresses reader to writer block by block until EOF, returns the number of payload bytes written.
+
+    Blocks are compressed in executor (the loop's default thread pool when None). Threads share the GIL
+    with the loop, a ProcessPoolExecutor keeps it responsive and uses more cores. Reading stops while
+    max_in_flight blocks are waiting, and output keeps the input order. The writer is left open.
+    """
+    try:
+        codec_id, function, _ = CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unknown codec {codec!r}, expected one of {sorted(CODECS)}") from None
+    if block_size <= 0 or max_in_flight <= 0:
+        raise ValueError("Block size and max_in_flight must be positive")
+
+    async def blocks():
+        while True:
+            block = await _read_block(reader, block_size)
+            if not block:
+                return
+            yield block
+
+    writer.write(MAGIC + bytes([codec_id]))
+    written = await _pipeline(blocks(), function, writer, executor, max_in_flight, framed=True)
+    writer.write(BLOCK_SIZE.pack(0))
+    await writer.drain()
+    return written
+
+
+async def decompress(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     executor: Optional[Executor] = None, max_in_flight: int = DEFAULT_IN_FLIGHT) -> int:
+    """Reverses compress, returns the number of bytes written. The writer is left open."""
+    header = await _read_block(reader, len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC or len(header) != len(MAGIC) + 1:
+        raise ValueError("Not a compressed stream")
+    functions = {codec_id: function for codec_id, _, function in CODECS.values()}
+    function = functions.get(header[-1])
+    if function is None:
+        raise ValueError(f"Unknown codec id {header[-1]}")
+    if max_in_flight <= 0:
+        raise ValueError("max_in_flight must be positive")
+
+    async def blocks():
+        while True:
+            size_bytes = await _read_block(reader, BLOCK_SIZE.size)
+            if len(size_bytes) != BLOCK_SIZE.size:
+                raise ValueError("Stream ended before its last block")
+            size, = BLOCK_SIZE.unpack(size_bytes)
+            if not size:
+                return
+            payload = await _read_block(reader, size)
+            if len(payload) != size:
+                raise ValueError("Stream ended inside a block")
+            yield payload
+
+    return await _pipeline(blocks(), function, writer, executor, max_in_flight, framed=False)
+
+
+if __name__ == "__main__":
+    import socket
+
+    async def main():
+        text = b"A_DEAD_DAD_CEDED_A_BAD_BABE_A_BEADED_ABACA_BED" * 200
+        left, right = socket.socketpair()
+        # Both ends keep their unused halves referenced, a collected StreamWriter closes its socket
+        _, sender = await asyncio.open_connection(sock=left)
+        receiver, receiver_writer = await asyncio.open_connection(sock=right)
+
+        source = asyncio.StreamReader()
+        source.feed_data(text)
+        source.feed_eof()
+
+        async def send() -> int:
+            written = await compress(source, sender, block_size=1024)
+            sender.close()
+            return written
+
+        class Collect:
+            def __init__(self):
+                self.data = bytearray()
+
+            def write(self, data: bytes):
+                self.data += data
+
+            async def drain(self):
+                pass
+
+        output = Collect()
+        written, _ = await asyncio.gather(send(), decompress(receiver, output))
+        print(len(text), written, bytes(output.data) == text)
+
+    asyncio.run(main())
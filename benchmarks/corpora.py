@@ -0,0 +1,92 @@
+"""Deterministic benchmark inputs, generated offline from a seed so every run measures the same bytes."""
+import random
+
+KIB: int = 1 << 10
+MIB: int = 1 << 20
+
+_SYLLABLES = ["ka", "lo", "mi", "re", "tan", "su", "ve", "no", "th", "ing", "er", "an", "qu", "is", "pro", "de"]
+_LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+_SERVICES = ["auth", "billing", "gateway", "search", "storage", "worker"]
+
+
+def parse_size(text: str) -> int:
+    """'64K', '1M' or a plain number of bytes."""
+    text = text.strip().upper()
+    multiplier = {"K": KIB, "M": MIB, "G": 1 << 30}.get(text[-1:], 1)
+    return int(float(text.rstrip("KMGB") if multiplier != 1 else text) * multiplier)
+
+
+def random_bytes(size: int, seed: int = 0) -> bytes:
+    """Incompressible input."""
+    return random.Random(seed).randbytes(size)
+
+
+def repetitive(size: int, seed: int = 0) -> bytes:
+    """A 64 byte phrase repeated, with one byte changed about every 4 KB."""
+    rng = random.Random(seed)
+    phrase = rng.randbytes(64)
+    data = bytearray((phrase * (size // 64 + 1))[:size])
+    for position in range(0, size, 4 * KIB):
+        data[rng.randrange(position, min(position + 4 * KIB, size))] = rng.randrange(256)
+    return bytes(data)
+
+
+def english(size: int, seed: int = 0) -> bytes:
+    """English-like sentences over a Zipf distributed vocabulary of made up words."""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(2000)]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    parts = []
+    length = 0
+    while length < size:
+        words = rng.choices(vocabulary, weights, k=rng.randint(4, 18))
+        sentence = " ".join(words).capitalize() + rng.choice([". ", ". ", ", ", "? ", ".\n"])
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts).encode()[:size]
+
+
+def logs(size: int, seed: int = 0) -> bytes:
+    """Service log lines with increasing timestamps, request ids and client addresses."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    milliseconds = 1_700_000_000_000
+    while length < size:
+        milliseconds += rng.randint(0, 250)
+        line = (f"{milliseconds // 1000}.{milliseconds % 1000:03d} {rng.choice(_LEVELS):5} "
+                f"[{rng.choice(_SERVICES)}] request={rng.getrandbits(32):08x} "
+                f"client=10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(256)} "
+                f"status={rng.choice((200, 200, 200, 204, 404, 500))} took={rng.randint(1, 900)}ms\n")
+        parts.append(line)
+        length += len(line)
+    return "".join(parts).encode()[:size]
+
+
+def dna(size: int, seed: int = 0) -> bytes:
+    """ACGT with copies of earlier segments mixed in, like repeats in a genome."""
+    rng = random.Random(seed)
+    data = bytearray()
+    while len(data) < size:
+        if len(data) > 1000 and rng.random() < 0.2:
+            start = rng.randrange(len(data) - 500)
+            data += data[start:start + rng.randint(50, 500)]
+        else:
+            data += bytes(rng.choices(b"ACGT", k=rng.randint(100, 1000)))
+    return bytes(data[:size])
+
+
+CORPORA: dict = {
+    "random": random_bytes,
+    "repetitive": repetitive,
+    "english": english,
+    "logs": logs,
+    "dna": dna,
+}
+
+
+def generate(name: str, size: int, seed: int = 0) -> bytes:
+    try:
+        return CORPORA[name](size, seed)
+    except KeyError:
+        raise ValueError(f"Unknown corpus {name!r}, expected one of {sorted(CORPORA)}") from None
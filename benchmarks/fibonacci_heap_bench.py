@@ -0,0 +1,52 @@
+"""Microbenchmark for FibonacciHeap push, decrease_key and extract_min.
+
+Run from the repository root: python -m benchmarks.fibonacci_heap_bench --size 1000000
+"""
+import argparse
+import random
+import time
+
+try:
+    from ..fibonacci_heap import FibonacciHeap
+except (ImportError, ValueError):
+    from fibonacci_heap import FibonacciHeap
+
+
+def run(size: int, extracts: int, seed: int = 0) -> dict[str, float]:
+    """Returns operations per second for each phase on a heap of size keys."""
+    rng = random.Random(seed)
+    keys = [rng.random() * size for _ in range(size)]
+    heap = FibonacciHeap()
+    results = {}
+
+    start = time.perf_counter()
+    handles = [heap.push(key, i) for i, key in enumerate(keys)]
+    results["push"] = size / (time.perf_counter() - start)
+
+    # The first extract_min consolidates every root, timed on its own
+    start = time.perf_counter()
+    removed = heap.extract_min()
+    results["first_extract_min_seconds"] = time.perf_counter() - start
+
+    # Decrease a random half of the keys, which cuts nodes out of the trees built above
+    victims = rng.sample([node for node in handles if node is not removed], size // 2)
+    start = time.perf_counter()
+    for node in victims:
+        heap.decrease_key(node, node.key - rng.random() * size)
+    results["decrease_key"] = len(victims) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(extracts):
+        heap.extract_min()
+    results["extract_min"] = extracts / (time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10 ** 6)
+    parser.add_argument("--extracts", type=int, default=10 ** 5)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    for name, value in run(arguments.size, arguments.extracts, arguments.seed).items():
+        print(f"{name:>28}: {value:,.2f}")
@@ -0,0 +1,65 @@
+"""Compares the priority queue backends under dijkstra and prim at several graph densities.
+
+Run from the repository root: python -m benchmarks.graph_bench --vertices 20000 --degrees 2,8,32,128
+"""
+import argparse
+import random
+import time
+
+try:
+    from ..graph_engine import CSRGraph, dijkstra, prim
+    from ..priority_queues import QUEUES
+except (ImportError, ValueError):
+    from graph_engine import CSRGraph, dijkstra, prim
+    from priority_queues import QUEUES
+
+
+def random_graph(vertices: int, degree: int, seed: int = 0) -> CSRGraph:
+    """Undirected graph with about degree edges per vertex and int weights in [1, 1000]."""
+    rng = random.Random(seed)
+    edges = [(rng.randrange(vertices), rng.randrange(vertices), rng.randint(1, 1000))
+             for _ in range(vertices * degree // 2)]
+    return CSRGraph.from_edges(vertices, edges)
+
+
+def run(vertices: int, degrees: list[int], seed: int = 0) -> dict[int, dict[str, dict[str, float]]]:
+    """Returns seconds per run for every degree, algorithm and backend, checking the backends agree."""
+    results = {}
+    for degree in degrees:
+        graph = random_graph(vertices, degree, seed)
+        timings = {"dijkstra": {}, "prim": {}}
+        expected_distance = expected_total = None
+        for name in QUEUES:
+            start = time.perf_counter()
+            distance, _ = dijkstra(graph, 0, name)
+            timings["dijkstra"][name] = time.perf_counter() - start
+            if expected_distance is None:
+                expected_distance = distance
+            elif distance != expected_distance:
+                raise AssertionError(f"{name} dijkstra disagrees with the other backends")
+
+            # Prim keys are not monotone, the radix heap cannot run it
+            if name == "radix":
+                continue
+            start = time.perf_counter()
+            total, _ = prim(graph, name)
+            timings["prim"][name] = time.perf_counter() - start
+            if expected_total is None:
+                expected_total = total
+            elif total != expected_total:
+                raise AssertionError(f"{name} prim disagrees with the other backends")
+        results[degree] = timings
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vertices", type=int, default=20000)
+    parser.add_argument("--degrees", default="2,8,32,128", help="comma separated average degrees")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    degrees = [int(degree) for degree in arguments.degrees.split(",")]
+    for degree, timings in run(arguments.vertices, degrees, arguments.seed).items():
+        for algorithm, seconds in timings.items():
+            row = "  ".join(f"{name} {value:.3f}s" for name, value in seconds.items())
+            print(f"degree {degree:>4} {algorithm:>8}: {row}  -> {min(seconds, key=seconds.get)}")
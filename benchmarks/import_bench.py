@@ -0,0 +1,71 @@
+"""Import-time budget for every library module, each measured in a fresh interpreter.
+
+Run from the repository root: python -m benchmarks.import_bench --repeat 5
+Exits with status 1 when a module goes over its budget or loads a module from HEAVY_MODULES.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per module in milliseconds, before --scale
+DEFAULT_BUDGET_MS: float = 150.0
+BUDGETS_MS: dict[str, float] = {
+    # These pull in NumPy when it is installed
+    "suffix_array": 400.0,
+    "BWT": 400.0,
+    "fm_index": 400.0,
+    "block_sort": 400.0,
+}
+MODULES: list[str] = [
+    "bitstream", "elias_omega", "lz77", "huffman", "container", "suffix_array", "BWT", "fm_index",
+    "block_sort", "z_algorithm", "fibonacci_heap", "fibonacci_heap_visualizer", "priority_queues",
+    "graph_engine", "memo_cache",
+]
+# Plotting and GUI packages that no library module may load at import time
+HEAVY_MODULES: list[str] = ["networkx", "matplotlib", "mpl_toolkits", "fontTools", "tkinter"]
+
+_PROBE = "import sys, json; import {module}; print(json.dumps([name for name in {heavy!r} if name in sys.modules]))"
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Cumulative import time of module in milliseconds and the heavy modules it loaded."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    # -X importtime lines are "import time: self | cumulative | name", the top level entry has no indent
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module and not fields[2][1:].startswith(" "):
+            return int(fields[1]) / 1000, json.loads(completed.stdout)
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def run(repeat: int = 5, scale: float = 1.0, modules: list[str] = MODULES) -> list[dict]:
+    """Best of repeat timings for every module against its scaled budget."""
+    results = []
+    for module in modules:
+        timings = [measure(module) for _ in range(repeat)]
+        milliseconds = min(timing for timing, _ in timings)
+        heavy = sorted(set(name for _, loaded in timings for name in loaded))
+        budget = BUDGETS_MS.get(module, DEFAULT_BUDGET_MS) * scale
+        results.append({"module": module, "milliseconds": milliseconds, "budget": budget, "heavy": heavy,
+                        "ok": milliseconds <= budget and not heavy})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies every budget, for slow hosts")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    arguments = parser.parse_args()
+    results = run(arguments.repeat, arguments.scale, arguments.modules)
+    for result in results:
+        status = "ok" if result["ok"] else "OVER"
+        heavy = f"  loads {', '.join(result['heavy'])}" if result["heavy"] else ""
+        print(f"{result['module']:>26}: {result['milliseconds']:8.2f} ms of {result['budget']:.0f} ms  {status}{heavy}")
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
@@ -0,0 +1,42 @@
+"""Checks that LZ77.encode_stream keeps its memory flat as the input grows, the match finder bounded by its window.
+
+Run from the repository root: python -m benchmarks.stream_memory --sizes 64K,256K,1M
+Exits with status 1 when the peak at the largest size is over the smallest one's by more than --tolerance.
+"""
+import argparse
+import io
+import sys
+import tracemalloc
+
+try:
+    from .corpora import generate, parse_size
+    from ..lz77 import LZ77
+except (ImportError, ValueError):
+    from benchmarks.corpora import generate, parse_size
+    from lz77 import LZ77
+
+
+def peak(size: int, window: int = 4096, lookahead: int = 32, corpus: str = "random") -> int:
+    """Peak bytes allocated while streaming size bytes of corpus through the encoder, input excluded."""
+    reader = io.BytesIO(generate(corpus, size))
+    tracemalloc.start()
+    try:
+        for _ in LZ77(window, lookahead).encode_stream(reader):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64K,256K", help="comma separated input sizes, smallest first")
+    parser.add_argument("--window", type=int, default=4096)
+    parser.add_argument("--corpus", default="random")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    arguments = parser.parse_args()
+    peaks = []
+    for size in [parse_size(size) for size in arguments.sizes.split(",")]:
+        peaks.append(peak(size, arguments.window, corpus=arguments.corpus))
+        print(f"{size:>12} bytes: peak {peaks[-1] / 1e6:8.3f} MB")
+    sys.exit(0 if peaks[-1] <= peaks[0] * (1 + arguments.tolerance) else 1)
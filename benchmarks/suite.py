@@ -0,0 +1,223 @@
+"""Benchmark suite: throughput, peak memory and compression ratio of every codec on deterministic corpora.
+
+Run from the repository root:
+    python -m benchmarks.suite run --sizes 1K,64K --output results.json
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.1
+run --baseline FILE compares right away. Either way the exit status is 1 when something regressed.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    from .corpora import CORPORA, generate, parse_size
+    from ..BWT import BWT
+    from ..block_sort import BlockSortCompressor
+    from ..container import LZ77Container
+    from ..elias_omega import EliasOmega
+    from ..fibonacci_heap import FibonacciHeap
+    from ..huffman import HuffmanEncoding
+    from ..lz77 import LZ77
+    from ..z_algorithm import ZAlgorithm
+except (ImportError, ValueError):
+    from benchmarks.corpora import CORPORA, generate, parse_size
+    from BWT import BWT
+    from block_sort import BlockSortCompressor
+    from container import LZ77Container
+    from elias_omega import EliasOmega
+    from fibonacci_heap import FibonacciHeap
+    from huffman import HuffmanEncoding
+    from lz77 import LZ77
+    from z_algorithm import ZAlgorithm
+
+FORMAT_VERSION: int = 1
+
+
+# Every case takes the corpus and returns its timed operations and the compressed size relative to the input
+
+def _lz77_case(data: bytes):
+    container = LZ77Container(LZ77(4096, 32))
+    packed = container.compress(data)
+    return {"compress": lambda: container.compress(data),
+            "decompress": lambda: LZ77Container.decompress(packed)}, len(packed) / len(data)
+
+
+def _huffman_case(data: bytes):
+    def build():
+        encoding = HuffmanEncoding()
+        encoding.build__huffman_tree(data)
+        return encoding.canonical(15)
+    code = build()
+    payload = code.encode(data)
+    return {"build": build,
+            "encode": lambda: code.encode(data),
+            "decode": lambda: code.decode(payload, len(data))}, len(payload) / len(data)
+
+
+def _bwt_case(data: bytes):
+    bwt = BWT(data)
+    bwt.transform()
+    return {"transform": lambda: BWT(data).transform(),
+            "inverse": lambda: BWT.inverse(bwt.last_column, bwt.primary_index)}, None
+
+
+def _block_sort_case(data: bytes):
+    compressor = BlockSortCompressor()
+    packed = compressor.compress(data)
+    return {"compress": lambda: compressor.compress(data),
+            "decompress": lambda: compressor.decompress(packed)}, len(packed) / len(data)
+
+
+def _z_algorithm_case(data: bytes):
+    # A pattern from the middle of the corpus, so there is at least one match
+    pattern = data[len(data) // 2:len(data) // 2 + 8]
+    return {"search": lambda: ZAlgorithm().pattern_matching(data, pattern)}, None
+
+
+def _elias_omega_case(data: bytes):
+    # Distance of every byte to the previous occurrence of the same value
+    last = [-1] * 256
+    numbers = []
+    for position, char in enumerate(data):
+        numbers.append(position - last[char])
+        last[char] = position
+    packed = EliasOmega.encode_many(numbers)
+    return {"encode": lambda: EliasOmega.encode_many(numbers),
+            "decode": lambda: EliasOmega.decode_many(packed)}, len(packed) / len(data)
+
+
+def _fibonacci_heap_case(data: bytes):
+    # Every byte is a key, a quarter of them are decreased before the heap is drained
+    def push_decrease_pop():
+        heap = FibonacciHeap()
+        handles = [heap.push(key, position) for position, key in enumerate(data)]
+        for handle in handles[::4]:
+            heap.decrease_key(handle, handle.key - 1)
+        while len(heap):
+            heap.pop()
+    return {"push_decrease_pop": push_decrease_pop}, None
+
+
+CASES: dict = {
+    "lz77": _lz77_case,
+    "huffman": _huffman_case,
+    "bwt": _bwt_case,
+    "block_sort": _block_sort_case,
+    "z_algorithm": _z_algorithm_case,
+    "elias_omega": _elias_omega_case,
+    "fibonacci_heap": _fibonacci_heap_case,
+}
+
+
+def measure(operation, size: int, repeat: int) -> dict:
+    """Best of repeat wall times after a warm-up run, then one more run under tracemalloc for the peak allocation."""
+    operation()  # Builds lazily cached tables, like the Elias omega and Huffman lookups
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "bytes_per_second": size / seconds if seconds else float("inf"),
+            "peak_bytes": peak}
+
+
+def run(codecs: list[str], corpora: list[str], sizes: list[int], repeat: int = 3, seed: int = 0) -> dict:
+    """Runs every codec on every corpus and size, returns the JSON document."""
+    results = []
+    for size in sizes:
+        for corpus in corpora:
+            data = generate(corpus, size, seed)
+            for codec in codecs:
+                operations, ratio = CASES[codec](data)
+                for operation, function in operations.items():
+                    result = {"codec": codec, "operation": operation, "corpus": corpus, "size": size,
+                              "ratio": ratio}
+                    result.update(measure(function, size, repeat))
+                    results.append(result)
+    meta = {"format": FORMAT_VERSION, "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "machine": platform.machine(),
+            "seed": seed, "repeat": repeat}
+    return {"meta": meta, "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[str]:
+    """Describes every result that got slower, used more memory or compressed worse by more than threshold."""
+    def key(result: dict):
+        return result["codec"], result["operation"], result["corpus"], result["size"]
+
+    old_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = old_results.get(key(result))
+        if old is None:
+            continue
+        name = "{} {} {} {}".format(*key(result))
+        if result["bytes_per_second"] < old["bytes_per_second"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {old['bytes_per_second']:,.0f} -> "
+                               f"{result['bytes_per_second']:,.0f} B/s")
+        if result["peak_bytes"] > old["peak_bytes"] * (1 + threshold):
+            regressions.append(f"{name}: peak memory {old['peak_bytes']:,} -> {result['peak_bytes']:,} B")
+        if result["ratio"] is not None and old["ratio"] is not None and result["ratio"] > old["ratio"] * (1 + threshold):
+            regressions.append(f"{name}: ratio {old['ratio']:.4f} -> {result['ratio']:.4f}")
+    return regressions
+
+
+def _print_results(document: dict):
+    for result in document["results"]:
+        ratio = f"{result['ratio']:.4f}" if result["ratio"] is not None else "-"
+        print(f"{result['codec']:>14} {result['operation']:>18} {result['corpus']:>10} {result['size']:>10} "
+              f"{result['bytes_per_second'] / 1e6:10.3f} MB/s {result['peak_bytes'] / 1e6:10.3f} MB  ratio {ratio}")
+
+
+def _print_regressions(regressions: list[str]) -> int:
+    for regression in regressions:
+        print("REGRESSION", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--codecs", default=",".join(CASES))
+    run_parser.add_argument("--corpora", default=",".join(CORPORA))
+    run_parser.add_argument("--sizes", default="1K,16K", help="comma separated sizes up to 100M, like 1K,1M")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="write the results as JSON")
+    run_parser.add_argument("--baseline", help="JSON results to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    if arguments.command == "compare":
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        with open(arguments.current) as file:
+            current = json.load(file)
+        sys.exit(_print_regressions(compare(baseline, current, arguments.threshold)))
+
+    for name in arguments.codecs.split(","):
+        if name not in CASES:
+            parser.error(f"unknown codec {name!r}, expected some of {', '.join(CASES)}")
+    document = run(arguments.codecs.split(","), arguments.corpora.split(","),
+                   [parse_size(size) for size in arguments.sizes.split(",")], arguments.repeat, arguments.seed)
+    _print_results(document)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(document, file, indent=1)
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            sys.exit(_print_regressions(compare(json.load(file), document, arguments.threshold)))
@@ -0,0 +1,185 @@
+from itertools import cycle, islice
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
+
+
+class BitWriter:
+    """Packs bits most significant first into a bytearray."""
+
+    def __init__(self):
+        self.buffer: bytearray = bytearray()
+        self.accumulator: int = 0  # Bits not yet flushed to the buffer
+        self.bit_count: int = 0  # Number of bits in the accumulator
+
+    def write(self, value: int, width: int):
+        """Writes the lowest width bits of value."""
+        self.accumulator = (self.accumulator << width) | (value & ((1 << width) - 1))
+        self.bit_count += width
+        if self.bit_count >= 64:
+            self._flush()
+
+    def write_many(self, symbols: Iterable, codes, fallback: Optional[Callable[['BitWriter', Any], None]] = None):
+        """Writes codes[symbol], a (code, width) pair, for every symbol.
+
+        Codes are gathered in a local accumulator and flushed 64 bits at a time. A symbol codes has no entry
+        for goes to fallback(writer, symbol), or raises the lookup error without one.
+        """
+        buffer = self.buffer
+        accumulator, bit_count = self.accumulator, self.bit_count
+        for symbol in symbols:
+            try:
+                code, width = codes[symbol]
+            except LookupError:
+                if fallback is None:
+                    self.accumulator, self.bit_count = accumulator, bit_count
+                    raise
+                self.accumulator, self.bit_count = accumulator, bit_count
+                fallback(self, symbol)
+                accumulator, bit_count = self.accumulator, self.bit_count
+                continue
+            accumulator = (accumulator << width) | code
+            bit_count += width
+            while bit_count >= 64:
+                bit_count -= 64
+                buffer += (accumulator >> bit_count).to_bytes(8, 'big')
+                accumulator &= (1 << bit_count) - 1
+        self.accumulator, self.bit_count = accumulator, bit_count
+
+    def write_bits(self, bits: str):
+        """Writes a string of '0'/'1' characters."""
+        if bits:
+            self.write(int(bits, 2), len(bits))
+
+    def _flush(self):
+        # Move every complete byte from the accumulator to the buffer
+        byte_count = self.bit_count >> 3
+        remainder = self.bit_count & 7
+        self.buffer += (self.accumulator >> remainder).to_bytes(byte_count, 'big')
+        self.accumulator &= (1 << remainder) - 1
+        self.bit_count = remainder
+
+    def __len__(self) -> int:
+        """Number of bits written so far."""
+        return (len(self.buffer) << 3) + self.bit_count
+
+    def getvalue(self, padding: int = 0) -> bytes:
+        """Returns the written bits, padded to a whole byte with padding (0 or 1) bits."""
+        self._flush()
+        if not self.bit_count:
+            return bytes(self.buffer)
+        fill = 8 - self.bit_count
+        last = (self.accumulator << fill) | (((1 << fill) - 1) if padding else 0)
+        return bytes(self.buffer) + bytes([last])
+
+
+class BitReader:
+    """Reads bits most significant first from a bytes-like buffer."""
+
+    def __init__(self, data, position: int = 0):
+        self.data = data
+        self.position: int = position  # Bit position of the next read
+        self.bit_length: int = len(data) << 3
+
+    def read(self, width: int) -> int:
+        """Reads width bits as an unsigned integer."""
+        position = self.position
+        if position + width > self.bit_length:
+            raise ValueError("Not enough bits left in the buffer")
+        start = position >> 3
+        end = (position + width + 7) >> 3
+        chunk = int.from_bytes(self.data[start:end], 'big')
+        self.position = position + width
+        return (chunk >> ((end << 3) - position - width)) & ((1 << width) - 1)
+
+    def peek(self, width: int) -> int:
+        """Returns the next width bits without consuming them, zero padded past the end."""
+        position = self.position
+        start = position >> 3
+        end = (position + width + 7) >> 3
+        chunk = int.from_bytes(bytes(self.data[start:end]).ljust(end - start, b'\0'), 'big')
+        return (chunk >> ((end << 3) - position - width)) & ((1 << width) - 1)
+
+    def read_bit(self) -> int:
+        """Reads a single bit."""
+        position = self.position
+        if position >= self.bit_length:
+            raise ValueError("Not enough bits left in the buffer")
+        self.position = position + 1
+        return (self.data[position >> 3] >> (7 - (position & 7))) & 1
+
+    def read_many(self, table, table_bits: int, output, count: Optional[int] = None,
+                  long_code: Optional[Callable[['BitReader'], Any]] = None):
+        """Decodes codes through a lookup table, appending the symbols to output, which is returned.
+
+        table[pattern] is (symbol, width) of the code every table_bits pattern starts with, width 0 when
+        the code is longer, then long_code(reader) reads it from position. Reads count symbols, or with
+        count None every code until only the '1' padding of BitWriter.getvalue(padding=1) is left.
+        """
+        return self.read_interleaved([(table, table_bits, long_code)], output, count)
+
+    def read_interleaved(self, decoders: Sequence[Tuple[Any, int, Optional[Callable[['BitReader'], Any]]]],
+                         output, count: Optional[int] = None):
+        """Like read_many for streams mixing codes, every symbol uses the next (table, table_bits, long_code)
+        of decoders in turn, starting again from the first after the last.
+
+        Bits come from a 64 bit accumulator refilled from the buffer, position is updated at the end.
+        """
+        append = output.append
+        decoders = [(table, table_bits, (1 << table_bits) - 1, long_code)
+                    for table, table_bits, long_code in decoders]
+        steps = cycle(decoders) if count is None else islice(cycle(decoders), count)
+        data = self.data if isinstance(self.data, bytes) else bytes(self.data)
+        bit_length = self.bit_length
+
+        # Bits are consumed from the top of the accumulator, byte_position is the next byte to load
+        accumulator, accumulator_bits, byte_position = self._window(data, self.position)
+        for table, table_bits, table_mask, long_code in steps:
+            if accumulator_bits < table_bits:
+                accumulator = ((accumulator & ((1 << accumulator_bits) - 1)) << 64) | \
+                    int.from_bytes(data[byte_position:byte_position + 8].ljust(8, b'\0'), 'big')
+                accumulator_bits += 64
+                byte_position += 8
+
+            if count is None:
+                remaining = bit_length - (byte_position << 3) + accumulator_bits
+                if remaining < 8:
+                    if remaining < 0:
+                        raise ValueError("Packed buffer ends in the middle of a code")
+                    padding = (1 << remaining) - 1
+                    if (accumulator >> (accumulator_bits - remaining)) & padding == padding:
+                        break
+
+            symbol, width = table[(accumulator >> (accumulator_bits - table_bits)) & table_mask]
+            if width:
+                accumulator_bits -= width
+            else:
+                if long_code is None:
+                    raise ValueError("Code longer than the lookup table")
+                # Long code, read through this reader from the accumulator's position
+                self.position = (byte_position << 3) - accumulator_bits
+                symbol = long_code(self)
+                accumulator, accumulator_bits, byte_position = self._window(data, self.position)
+            append(symbol)
+
+        position = (byte_position << 3) - accumulator_bits
+        if position > bit_length:
+            raise ValueError("Packed buffer ends in the middle of a code")
+        self.position = position
+        return output
+
+    @staticmethod
+    def _window(data: bytes, position: int) -> Tuple[int, int, int]:
+        # Accumulator, its bit count and the next byte to load for reading from bit position
+        byte_position = position >> 3
+        skip = position & 7
+        if not skip:
+            return 0, 0, byte_position
+        accumulator = data[byte_position] if byte_position < len(data) else 0
+        return accumulator, 8 - skip, byte_position + 1
+
+    def align(self):
+        """Skips to the next byte boundary."""
+        self.position = (self.position + 7) & ~7
+
+    def remaining(self) -> int:
+        """Number of bits left to read."""
+        return self.bit_length - self.position
@@ -0,0 +1,194 @@
+import struct
+import zlib
+from array import array
+
+try:
+    from . import metrics
+    from .BWT import BWT
+    from .bitstream import BitReader, BitWriter
+    from .huffman import CanonicalHuffman, HuffmanEncoding
+except ImportError:
+    import metrics
+    from BWT import BWT
+    from bitstream import BitReader, BitWriter
+    from huffman import CanonicalHuffman, HuffmanEncoding
+
+# Zero runs are written as bijective base 2 numbers with these two digits, other values move up by one
+RUN_A: int = 0
+RUN_B: int = 1
+# Symbols after zero run coding: RUN_A, RUN_B and the 255 shifted non-zero values
+ALPHABET_SIZE: int = 257
+
+
+def move_to_front(data: bytes) -> bytes:
+    """Replaces every byte with its position in a list of recently used bytes."""
+    order = bytearray(range(256))
+    output = bytearray(len(data))
+    for i, char in enumerate(data):
+        index = order.index(char)
+        output[i] = index
+        if index:
+            del order[index]
+            order.insert(0, char)
+    return bytes(output)
+
+
+def inverse_move_to_front(data: bytes) -> bytes:
+    order = bytearray(range(256))
+    output = bytearray(len(data))
+    for i, index in enumerate(data):
+        char = order[index]
+        output[i] = char
+        if index:
+            del order[index]
+            order.insert(0, char)
+    return bytes(output)
+
+
+def zero_run_encode(data: bytes) -> array:
+    """Codes runs of zeros with RUN_A/RUN_B digits, the rest of the values shift up by one."""
+    output = array('H')
+    append = output.append
+    run = 0
+    for value in data:
+        if not value:
+            run += 1
+            continue
+        while run:
+            if run & 1:
+                append(RUN_A)
+                run = (run - 1) >> 1
+            else:
+                append(RUN_B)
+                run = (run - 2) >> 1
+        append(value + 1)
+    while run:
+        if run & 1:
+            append(RUN_A)
+            run = (run - 1) >> 1
+        else:
+            append(RUN_B)
+            run = (run - 2) >> 1
+    return output
+
+
+def zero_run_decode(symbols) -> bytes:
+    output = bytearray()
+    run = 0
+    digit = 1  # Weight of the next run digit
+    for symbol in symbols:
+        if symbol <= RUN_B:
+            run += digit << symbol  # RUN_A adds digit, RUN_B adds twice that
+            digit <<= 1
+            continue
+        if run:
+            output += bytes(run)
+            run = 0
+            digit = 1
+        output.append(symbol - 1)
+    if run:
+        output += bytes(run)
+    return bytes(output)
+
+
+# Block layout: BWT primary index, symbol count, CRC-32 of the block, code lengths, Huffman bits
+BLOCK_HEADER = struct.Struct(">III")
+
+
+def compress_block(block: bytes) -> bytes:
+    """BWT, move-to-front, zero run coding and Huffman coding of one block."""
+    bwt = BWT(block)
+    bwt.transform()
+    # The sentinel's row is stored as the primary index, so it is left out of the coded column
+    last_column = bwt.last_column[:bwt.primary_index] + bwt.last_column[bwt.primary_index + 1:]
+    symbols = zero_run_encode(move_to_front(last_column))
+
+    writer = BitWriter()
+    if symbols:
+        encoding = HuffmanEncoding()
+        encoding.build__huffman_tree(symbols)
+        code = encoding.canonical(BlockSortCompressor.MAX_CODE_LENGTH)
+        for symbol in range(ALPHABET_SIZE):
+            writer.write(code.lengths.get(symbol, 0), 4)
+        payload = code.encode(symbols)
+    else:
+        payload = b""
+    header = BLOCK_HEADER.pack(bwt.primary_index, len(symbols), zlib.crc32(block))
+    return header + writer.getvalue() + payload
+
+
+def decompress_block(payload: bytes) -> bytes:
+    primary_index, count, checksum = BLOCK_HEADER.unpack_from(payload)
+    position = BLOCK_HEADER.size
+    if count:
+        reader = BitReader(payload, position << 3)
+        code = CanonicalHuffman({symbol: reader.read(4) for symbol in range(ALPHABET_SIZE)})
+        reader.align()
+        symbols = code.decode(memoryview(payload)[reader.position >> 3:], count)
+    else:
+        symbols = ()
+
+    last_column = inverse_move_to_front(zero_run_decode(symbols))
+    last_column = last_column[:primary_index] + b"$" + last_column[primary_index:]
+    block = BWT.inverse(last_column, primary_index)
+    if zlib.crc32(block) != checksum:
+        raise ValueError("Block does not match its checksum")
+    return block
+
+
+class BlockSortCompressor:
+    """bzip2 style compressor: data is cut into blocks that are coded independently, in a process pool.
+
+    Frame layout: magic, block size, then every block as its compressed size followed by compress_block output.
+    """
+    MAGIC: bytes = b"BSRT"
+    HEADER = struct.Struct(">4sI")
+    MAX_CODE_LENGTH: int = 15
+
+    def __init__(self, block_size: int = 1 << 18, workers: int = 1):
+        self.block_size: int = block_size
+        self.workers: int = workers
+
+    @metrics.timed("block_sort.compress")
+    def compress(self, data: bytes) -> bytes:
+        blocks = [data[start:start + self.block_size] for start in range(0, len(data), self.block_size)]
+        output = bytearray(self.HEADER.pack(self.MAGIC, self.block_size))
+        for payload in self._map(compress_block, blocks):
+            output += struct.pack(">I", len(payload))
+            output += payload
+        return bytes(output)
+
+    @metrics.timed("block_sort.decompress", argument=None)
+    def decompress(self, blob: bytes) -> bytes:
+        if len(blob) < self.HEADER.size:
+            raise ValueError("Buffer is too short to hold a block sorted stream header")
+        magic, _ = self.HEADER.unpack_from(blob)
+        if magic != self.MAGIC:
+            raise ValueError("Not a block sorted stream")
+        payloads = []
+        position = self.HEADER.size
+        while position < len(blob):
+            if position + 4 > len(blob):
+                raise ValueError("Stream ends inside a block size")
+            size, = struct.unpack_from(">I", blob, position)
+            position += 4
+            if position + size > len(blob):
+                raise ValueError("Stream ends inside a block")
+            payloads.append(blob[position:position + size])
+            position += size
+        return b"".join(self._map(decompress_block, payloads))
+
+    def _map(self, function, items: list) -> list:
+        if self.workers <= 1 or len(items) <= 1:
+            return list(map(function, items))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(self.workers) as executor:
+            return list(executor.map(function, items))
+
+
+if __name__ == "__main__":
+    compressor = BlockSortCompressor(block_size=64)
+    text = b"A_DEAD_DAD_CEDED_A_BAD_BABE_A_BEADED_ABACA_BED" * 4
+    packed = compressor.compress(text)
+    print(len(text), len(packed))
+    print(compressor.decompress(packed))
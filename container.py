@@ -0,0 +1,244 @@
+import mmap
+import struct
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+
+try:
+    from . import metrics
+    from .bitstream import BitReader, BitWriter
+    from .elias_omega import EliasOmega
+    from .huffman import CanonicalHuffman, HuffmanEncoding
+    from .lz77 import LZ77
+except ImportError:
+    import metrics
+    from bitstream import BitReader, BitWriter
+    from elias_omega import EliasOmega
+    from huffman import CanonicalHuffman, HuffmanEncoding
+    from lz77 import LZ77
+
+
+class LZ77Container:
+    """Stores LZ77 tuples as bytes: Elias Omega offsets and lengths, Huffman coded literals.
+
+    Layout: header, canonical code lengths of the literals, then one code per tuple
+    (offset + 1, length + 1, literal), zero padded to a whole byte.
+    The header keeps the size and CRC-32 of the original data.
+    """
+    MAGIC: bytes = b"LZ7C"
+    VERSION: int = 2
+    # magic, version, flags, max_window, max_lookahead_buffer, tuple count, original size, CRC-32
+    HEADER = struct.Struct(">4sBBIIQQI")
+    # Flag set when the last tuple has no literal (its match reaches the end of the data)
+    FLAG_NO_LAST_LITERAL: int = 1
+    # Longest literal code, lengths are stored in 4 bits
+    MAX_CODE_LENGTH: int = 15
+
+    def __init__(self, lz77: LZ77, workers: int = 1):
+        self.lz77: LZ77 = lz77
+        self.workers: int = workers  # Above 1, blocks are encoded in a process pool by LZ77.encode_parallel
+
+    @metrics.timed("lz77_container.compress")
+    def compress(self, data: bytes) -> bytes:
+        """Encodes data with LZ77 and packs the tuples."""
+        data = bytes(data)
+        tokens = self.lz77.encode(data) if self.workers <= 1 else self.lz77.encode_parallel(data, self.workers)
+        flags = 0
+        if tokens and not tokens[-1][2]:
+            flags |= self.FLAG_NO_LAST_LITERAL
+
+        writer = BitWriter()
+        literals = b"".join(token[2] for token in tokens)
+        codes = self._write_code_table(writer, literals).codes
+        write = writer.write
+        for offset, length, next_char in tokens:
+            EliasOmega.write(writer, offset + 1)
+            EliasOmega.write(writer, length + 1)
+            if next_char:
+                write(*codes[next_char[0]])
+
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, flags, self.lz77.max_window,
+                                  self.lz77.max_lookahead_buffer, len(tokens), len(data), zlib.crc32(data))
+        return header + writer.getvalue()
+
+    @classmethod
+    def read_tokens(cls, blob: bytes) -> tuple[LZ77, list[(int, int, bytes)]]:
+        """Unpacks a container into an LZ77 with the stored settings and its tuples."""
+        if len(blob) < cls.HEADER.size:
+            raise ValueError("Buffer is too short to hold a container header")
+        magic, version, flags, max_window, max_lookahead, count, _, _ = cls.HEADER.unpack_from(blob)
+        if magic != cls.MAGIC:
+            raise ValueError("Not an LZ77 container")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+
+        reader = BitReader(memoryview(blob)[cls.HEADER.size:])
+        lz77 = LZ77(max_window, max_lookahead)
+        if not count:
+            return lz77, []
+        code = cls._read_code_table(reader)
+        # Offset + 1, length + 1 and literal codes follow each other, so one table-driven pass reads them all
+        omega = EliasOmega.decoder()
+        no_last_literal = flags & cls.FLAG_NO_LAST_LITERAL
+        values = reader.read_interleaved([omega, omega, code.decoder()], [], 3 * count - bool(no_last_literal))
+        chars = [bytes((char,)) for char in range(256)]
+        tokens = [(offset - 1, length - 1, chars[char])
+                  for offset, length, char in zip(values[0::3], values[1::3], values[2::3])]
+        if no_last_literal:
+            tokens.append((values[-2] - 1, values[-1] - 1, b""))
+        return lz77, tokens
+
+    @classmethod
+    @metrics.timed("lz77_container.decompress", argument=None)
+    def decompress(cls, blob: bytes) -> bytes:
+        """Unpacks a container, decodes it and checks the stored size and CRC-32."""
+        lz77, tokens = cls.read_tokens(blob)
+        data = lz77.decode(tokens, dictionary=b"")
+        _, _, _, _, _, _, size, checksum = cls.HEADER.unpack_from(blob)
+        if len(data) != size or zlib.crc32(data) != checksum:
+            raise ValueError("Decoded data does not match the container checksum")
+        return data
+
+    @classmethod
+    def _write_code_table(cls, writer: BitWriter, literals: bytes) -> CanonicalHuffman:
+        # Symbol count - 1 in 8 bits, then 8 bit symbol and 4 bit code length for each literal byte used
+        if not literals:
+            return CanonicalHuffman({})
+        encoding = HuffmanEncoding()
+        encoding.build__huffman_tree(literals)
+        code = encoding.canonical(cls.MAX_CODE_LENGTH)
+        writer.write(len(code.lengths) - 1, 8)
+        for char in sorted(code.lengths):
+            writer.write(char, 8)
+            writer.write(code.lengths[char], 4)
+        return code
+
+    @staticmethod
+    def _read_code_table(reader: BitReader) -> CanonicalHuffman:
+        lengths = {}
+        for _ in range(reader.read(8) + 1):
+            char = reader.read(8)
+            lengths[char] = reader.read(4)
+        return CanonicalHuffman(lengths)
+
+
+class SeekableLZ77Container:
+    """Cuts data into blocks that are compressed independently, so any range decodes from its blocks alone.
+
+    Layout: header, block index (uncompressed offset, compressed offset) per block, then every block
+    as an LZ77Container. Compressed offsets count from the start of the blob.
+    """
+    MAGIC: bytes = b"LZ7S"
+    VERSION: int = 1
+    # magic, version, block size, block count, original size
+    HEADER = struct.Struct(">4sBIQQ")
+    INDEX_ENTRY = struct.Struct(">QQ")
+
+    def __init__(self, lz77: LZ77, block_size: int = 1 << 16):
+        if block_size <= 0:
+            raise ValueError("Block size must be positive")
+        self.lz77: LZ77 = lz77
+        self.block_size: int = block_size
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresses every block_size slice of data with a fresh window."""
+        view = memoryview(data).cast('B')
+        container = LZ77Container(self.lz77)
+        blocks = [container.compress(view[start:start + self.block_size])
+                  for start in range(0, len(view), self.block_size)]
+
+        position = self.HEADER.size + self.INDEX_ENTRY.size * len(blocks)
+        output = bytearray(self.HEADER.pack(self.MAGIC, self.VERSION, self.block_size, len(blocks), len(view)))
+        for i, block in enumerate(blocks):
+            output += self.INDEX_ENTRY.pack(i * self.block_size, position)
+            position += len(block)
+        for block in blocks:
+            output += block
+        return bytes(output)
+
+    @classmethod
+    def decompress(cls, blob: bytes) -> bytes:
+        reader = SeekableLZ77Reader(blob, cache_blocks=0)
+        return reader.read(0, len(reader))
+
+
+class SeekableLZ77Reader:
+    """Random access reads from a SeekableLZ77Container blob, an mmap or any other buffer.
+
+    Only the blocks overlapping a read are decoded, the last cache_blocks of them are kept in an LRU cache.
+    """
+
+    def __init__(self, blob, cache_blocks: int = 16):
+        self.blob = memoryview(blob).cast('B')
+        if len(self.blob) < SeekableLZ77Container.HEADER.size:
+            raise ValueError("Buffer is too short to hold a seekable container header")
+        magic, version, self.block_size, count, self.size = SeekableLZ77Container.HEADER.unpack_from(self.blob)
+        if magic != SeekableLZ77Container.MAGIC:
+            raise ValueError("Not a seekable LZ77 container")
+        if version != SeekableLZ77Container.VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+
+        entry = SeekableLZ77Container.INDEX_ENTRY
+        self.starts: list[int] = []  # Uncompressed offset of every block
+        self.positions: list[int] = []  # Compressed offset of every block, then the end of the last one
+        for start, position in entry.iter_unpack(self.blob[SeekableLZ77Container.HEADER.size:
+                                                           SeekableLZ77Container.HEADER.size + entry.size * count]):
+            self.starts.append(start)
+            self.positions.append(position)
+        self.positions.append(len(self.blob))
+
+        self.cache_blocks: int = cache_blocks
+        self.cache: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def open(cls, path: str, cache_blocks: int = 16) -> 'SeekableLZ77Reader':
+        """Maps a container file, blocks are read from the page cache as they are needed."""
+        with open(path, 'rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), cache_blocks)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def block(self, index: int) -> bytes:
+        """Decoded block, from the cache when it was read recently."""
+        cached = self.cache.get(index)
+        if cached is not None:
+            self.cache.move_to_end(index)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        data = LZ77Container.decompress(self.blob[self.positions[index]:self.positions[index + 1]])
+        if self.cache_blocks > 0:
+            self.cache[index] = data
+            if len(self.cache) > self.cache_blocks:
+                self.cache.popitem(last=False)
+        return data
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Up to size bytes starting at offset in the original data, fewer at the end of it."""
+        if offset < 0 or size < 0:
+            raise ValueError("Offset and size must not be negative")
+        stop = min(offset + size, self.size)
+        if offset >= stop:
+            return b""
+        index = bisect_right(self.starts, offset) - 1
+        parts = []
+        while index < len(self.starts) and self.starts[index] < stop:
+            start = self.starts[index]
+            block = self.block(index)
+            parts.append(block[max(offset - start, 0):stop - start])
+            index += 1
+        return b"".join(parts)
+
+
+if __name__ == "__main__":
+    container = LZ77Container(LZ77(4096, 32))
+    text = b"aacaacabcabaaac" * 20
+    packed = container.compress(text)
+    print(len(text), len(packed))
+    print(LZ77Container.decompress(packed))
+
+    seekable = SeekableLZ77Container(LZ77(4096, 32), block_size=64).compress(text)
+    print(SeekableLZ77Reader(seekable).read(100, 20))
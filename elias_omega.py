@@ -1,3 +1,76 @@
+from array import array
+from functools import lru_cache
+from typing import Iterable
+
+try:
+    from . import metrics
+    from .bitstream import BitReader, BitWriter
+except ImportError:
+    import metrics
+    from bitstream import BitReader, BitWriter
+
+# Numbers below this use the precomputed encode table
+ENCODE_TABLE_SIZE: int = 1 << 12
+# Bits looked at per step by the table decoder
+DECODE_TABLE_BITS: int = 16
+
+
+@lru_cache(maxsize=None)
+def _encode_table() -> dict[int, tuple[int, int]]:
+    """(code, width) of the packed code for every number from 1 below ENCODE_TABLE_SIZE."""
+    table = {}
+    for value in range(1, ENCODE_TABLE_SIZE):
+        code, width = 0, 1  # Terminating '0'
+        number = value
+        while number > 1:
+            group_width = number.bit_length()
+            code |= number << width
+            width += group_width
+            number = group_width - 1
+        table[value] = (code, width)
+    return table
+
+
+@lru_cache(maxsize=None)
+def _decode_table() -> list[tuple[int, int]]:
+    """(number, width) of the packed code at the start of every DECODE_TABLE_BITS pattern, (0, 0) if it is longer."""
+    table = []
+    for pattern in range(1 << DECODE_TABLE_BITS):
+        number, position = 1, 0
+        entry = (0, 0)
+        while position < DECODE_TABLE_BITS:
+            bit = (pattern >> (DECODE_TABLE_BITS - 1 - position)) & 1
+            position += 1
+            if not bit:
+                entry = (number, position)
+                break
+            if position + number > DECODE_TABLE_BITS:
+                break
+            group = (pattern >> (DECODE_TABLE_BITS - position - number)) & ((1 << number) - 1)
+            position += number
+            number = (1 << number) | group
+        table.append(entry)
+    return table
+
+
+def _read_long(reader: BitReader) -> int:
+    """Reads a code longer than the decode table, splitting its groups from one 64 bit peek."""
+    window = reader.peek(64)
+    number, position = 1, 0
+    while (window >> (63 - position)) & 1:
+        end = position + number + 1
+        if end >= 64:
+            # Numbers this large go through the bit by bit reader
+            return EliasOmega.read(reader)
+        number = (window >> (64 - end)) & ((1 << (number + 1)) - 1)
+        position = end
+    # peek pads with zeros, so the closing '0' must lie inside the buffer
+    if reader.position + position + 1 > reader.bit_length:
+        raise ValueError("Not enough bits left in the buffer")
+    reader.position += position + 1
+    return number
+
+
 # Python
 class EliasOmega:
 
@@ -7,13 +80,13 @@ class EliasOmega:
         if number <= 0:
             raise ValueError("Number must be greater than 0")
 
-        result = ""  # Initialize the encoded result
+        groups = []  # Groups from last to first, joined once at the end
         while number > 0:
             binary = bin(number)[2:]  # Get binary representation of the number
             binary = '0' + binary[1:]  # Replace the leading '1' with '0'
-            result = binary + result  # Prepend the binary string to the result
+            groups.append(binary)
             number = len(binary) - 1  # Update the number to the length of the binary - 1
-        return result
+        return ''.join(reversed(groups))
 
     def decode(encoded: str) -> int:
         """Decodes an Elias Omega encoded string back to an integer."""
@@ -35,8 +108,59 @@ class EliasOmega:
             length = int(component, 2)
             readlen = length + 1
 
+    # Packed codes use the self-delimiting form: every group starts with '1' and a '0' bit ends the code
+    @staticmethod
+    def write(writer: BitWriter, number: int):
+        """Writes the Elias Omega code of number to a BitWriter."""
+        if number <= 0:
+            raise ValueError("Number must be greater than 0")
+
+        if number < ENCODE_TABLE_SIZE:
+            writer.write(*_encode_table()[number])
+            return
+
+        groups = []
+        while number > 1:
+            groups.append(number)
+            number = number.bit_length() - 1
+        for group in reversed(groups):
+            writer.write(group, group.bit_length())
+        writer.write(0, 1)
+
+    @staticmethod
+    def read(reader: BitReader) -> int:
+        """Reads one Elias Omega code from a BitReader."""
+        number = 1
+        while reader.read_bit():
+            # The '1' already read is the leading bit of the next group
+            number = (1 << number) | reader.read(number)
+        return number
+
+    @staticmethod
+    @metrics.timed("elias_omega.encode_many", argument=None)
+    def encode_many(numbers: Iterable[int]) -> bytes:
+        """Packs a sequence of positive integers into bytes, padded with '1' bits so no extra code is read back."""
+        writer = BitWriter()
+        # Table codes go through the writer's accumulator loop, other numbers through write
+        writer.write_many(numbers, _encode_table(), EliasOmega.write)
+        return writer.getvalue(padding=1)
+
+    @staticmethod
+    @metrics.timed("elias_omega.decode_many", argument=0)
+    def decode_many(data) -> array:
+        """Unpacks every code in a buffer produced by encode_many into an array('Q')."""
+        return BitReader(data).read_interleaved([EliasOmega.decoder()], array('Q'))
+
+    @staticmethod
+    def decoder() -> tuple:
+        """(table, table_bits, long_code) of the codes for BitReader.read_many and read_interleaved."""
+        return _decode_table(), DECODE_TABLE_BITS, _read_long
+
 if __name__ == "__main__":
     encoded = EliasOmega.encode(50000)
     print(encoded)
     decoded = EliasOmega.decode(encoded)
-    print(decoded)
\ No newline at end of file
+    print(decoded)
+    packed = EliasOmega.encode_many([1, 2, 3, 50000, 17])
+    print(packed.hex())
+    print(list(EliasOmega.decode_many(packed)))
\ No newline at end of file
@@ -1,8 +1,18 @@
-from typing import List
+from array import array
+from typing import Any, Iterable, List, Optional, Tuple
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
 
 class FibNode:
-    def __init__(self):
-        self.key = None
+    # Fixed slots instead of a per-node __dict__, heaps hold millions of these
+    __slots__ = ('key', 'value', 'degree', 'marked', 'parent', 'child', 'left_sibling', 'right_sibling')
+
+    def __init__(self, key=None, value=None):
+        self.key = key
+        self.value = value  # Payload carried with the key
         self.degree: int = 0
         self.marked: bool = False
         self.parent: FibNode = None
@@ -13,8 +23,60 @@ class FibNode:
 class FibonacciHeap:
     def __init__(self):
         self.H_min: FibNode = None
+        self.size: int = 0  # Number of nodes in the heap
+        self._degree_table: List[Optional[FibNode]] = []  # Reusable consolidate buckets
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key, value=None) -> FibNode:
+        """Inserts key with a payload and returns the node, which is the handle for decrease_key and delete."""
+        fib_node = FibNode(key, value)
+        self.insert(fib_node)
+        return fib_node
+
+    def peek(self) -> Optional[Tuple[Any, Any]]:
+        """Returns (key, value) of the minimum without removing it, None when empty."""
+        if self.H_min is None:
+            return None
+        return self.H_min.key, self.H_min.value
+
+    def pop(self) -> Tuple[Any, Any]:
+        """Removes the minimum and returns its (key, value)."""
+        min_node = self.extract_min()
+        if min_node is None:
+            raise IndexError("pop from an empty heap")
+        return min_node.key, min_node.value
+
+    def heapify(self, items: Iterable[Tuple[Any, Any]]) -> List[FibNode]:
+        """Adds (key, value) pairs as one run of roots, linked in a single pass. Returns their handles."""
+        handles = []
+        first = last = minimum = None
+        for key, value in items:
+            fib_node = FibNode(key, value)
+            handles.append(fib_node)
+            if first is None:
+                first = fib_node
+            else:
+                last.right_sibling = fib_node
+                fib_node.left_sibling = last
+            last = fib_node
+            if minimum is None or key < minimum.key:
+                minimum = fib_node
+        if first is None:
+            return handles
+
+        # Close the run into its own circular list and splice it in like another heap
+        last.right_sibling = first
+        first.left_sibling = last
+        other = FibonacciHeap()
+        other.H_min = minimum
+        other.size = len(handles)
+        self.merge(other)
+        return handles
 
     def insert(self, fib_node: FibNode):
+        self.size += 1
         if self.H_min is None:
             self._initialize_heap(fib_node)
         elif fib_node.key < self.H_min.key:
@@ -43,6 +105,7 @@ class FibonacciHeap:
     def merge(self, heap: 'FibonacciHeap'):
         if heap is None or heap.H_min is None:
             return  # Nothing to merge if the other heap is empty
+        self.size += heap.size
         if self.H_min is None:
             # If the current heap is empty, adopt the other heap's H_min
             self.H_min = heap.H_min
@@ -63,90 +126,116 @@ class FibonacciHeap:
             self.H_min = heap.H_min
 
     def consolidate(self, current: FibNode):
-        aux_list = {}
-        terminal = current
-
-        while True:
-            degree = current.degree
-            while degree in aux_list:
-                other = aux_list.pop(degree)
-                if current.key > other.key:
-                    current, other = other, current
-                self._link_nodes(current, other)
+        # Degree buckets are reused across calls. A root of degree d has at least F(d + 2) nodes,
+        # so 2 * log2(n) + 2 buckets always suffice
+        table = self._degree_table
+        needed = self.size.bit_length() * 2 + 2
+        if len(table) < needed:
+            table.extend([None] * (needed - len(table)))
+
+        # Break the circle so the walk ends at None, every root is taken off the list as it is visited
+        current.left_sibling.right_sibling = None
+        max_degree = 0
+        roots = 0
+        while current is not None:
+            roots += 1
+            node = current
+            current = node.right_sibling
+            node.parent = None
+            node.marked = False
+            degree = node.degree
+            other = table[degree]
+            while other is not None:
+                table[degree] = None
+                if other.key < node.key:
+                    node, other = other, node
+                # Make other a child of node, other is already off the root list
+                other.parent = node
+                other.marked = False
+                child = node.child
+                if child is None:
+                    node.child = other
+                    other.left_sibling = other
+                    other.right_sibling = other
+                else:
+                    other.right_sibling = child.right_sibling
+                    other.left_sibling = child
+                    child.right_sibling.left_sibling = other
+                    child.right_sibling = other
                 degree += 1
-            aux_list[degree] = current
-            current = current.right_sibling
-            if current == terminal:
-                break
-
-        # Update H_min to the smallest key in the root list
-        self.H_min = None
-        for node in aux_list.values():
-            if self.H_min is None or node.key < self.H_min.key:
-                self.H_min = node
+                node.degree = degree
+                other = table[degree]
+            table[degree] = node
+            if degree > max_degree:
+                max_degree = degree
+
+        # Rebuild the root list from the buckets, emptying them for the next call, and find the minimum
+        h_min = first = last = None
+        remaining = 0
+        for degree in range(max_degree + 1):
+            node = table[degree]
+            if node is None:
+                continue
+            table[degree] = None
+            remaining += 1
+            if first is None:
+                first = node
+            else:
+                last.right_sibling = node
+                node.left_sibling = last
+            last = node
+            if h_min is None or node.key < h_min.key:
+                h_min = node
+        last.right_sibling = first
+        first.left_sibling = last
+        self.H_min = h_min
+
+        recorder = metrics.active
+        if recorder is not None:
+            # Every link takes one tree off the root list
+            recorder.count("fibonacci_heap.links", roots - remaining)
+            recorder.maximum("fibonacci_heap.max_root_list", roots)
 
     def extract_min(self) -> FibNode:
-        if self.H_min is None:
-            return None
-
         min_node = self.H_min
+        if min_node is None:
+            return None
 
-        # Add all children of min_node to the root list
-        if min_node.child is not None:
-            child = min_node.child
-            end = child
-
-            # Remove parent pointers for all children
-            while True:
-                next_child = child.right_sibling
-                child.parent = None
-                child.marked = False
-
-                # Add to root list
-                child.right_sibling = self.H_min.right_sibling
-                child.left_sibling = self.H_min
-                self.H_min.right_sibling.left_sibling = child
-                self.H_min.right_sibling = child
-
-                child = next_child
-                if child == end:
-                    break
-
-        # Remove min_node from the root list
-        if min_node.right_sibling == min_node:  # min_node is the only node
+        child = min_node.child
+        right = min_node.right_sibling
+        if right is min_node:
+            # min_node is the only root, its children become the root list
+            start = child
+        else:
+            # Remove min_node from the root list and splice its whole child list in its place,
+            # consolidate clears the children's parent pointers as it walks them
+            left = min_node.left_sibling
+            left.right_sibling = right
+            right.left_sibling = left
+            if child is not None:
+                child_last = child.left_sibling
+                left.right_sibling = child
+                child.left_sibling = left
+                child_last.right_sibling = right
+                right.left_sibling = child_last
+            start = right
+
+        if start is None:
             self.H_min = None
         else:
-            min_node.left_sibling.right_sibling = min_node.right_sibling
-            min_node.right_sibling.left_sibling = min_node.left_sibling
-            self.H_min = min_node.right_sibling
-
-            # Consolidate the root list
-            self.consolidate(self.H_min)
-
+            self.consolidate(start)
+
+        # Detach the node so the handle no longer points into the heap, a node that is its own parent is removed
+        self.size -= 1
+        min_node.child = None
+        min_node.left_sibling = min_node
+        min_node.right_sibling = min_node
+        min_node.parent = min_node
         return min_node
 
-    def _link_nodes(self, parent: FibNode, child: FibNode):
-        # Remove child from the root list
-        child.left_sibling.right_sibling = child.right_sibling
-        child.right_sibling.left_sibling = child.left_sibling
-
-        # Make child a child of parent
-        child.parent = parent
-        child.left_sibling = child
-        child.right_sibling = child
-        if parent.child is None:
-            parent.child = child
-        else:
-            child.right_sibling = parent.child.right_sibling
-            child.left_sibling = parent.child
-            parent.child.right_sibling.left_sibling = child
-            parent.child.right_sibling = child
-
-        # Update parent's degree and mark child as unmarked
-        parent.degree += 1
-        child.marked = False
-
     def decrease_key(self, node: FibNode, new_key: int):
+        if node.parent is node:
+            raise ValueError("Node is no longer in the heap")
         if new_key > node.key:
             raise ValueError("New key must be smaller than the current key.")
 
@@ -160,6 +249,18 @@ class FibonacciHeap:
         if node.key < self.H_min.key:
             self.H_min = node
 
+    def delete(self, node: FibNode):
+        """Removes a node from the heap."""
+        if node.parent is node:
+            raise ValueError("Node is no longer in the heap")
+        # Move the node to the root list, make it the minimum and extract it, no -infinity key needed
+        parent = node.parent
+        if parent:
+            self._cut(node, parent)
+            self._cascading_cut(parent)
+        self.H_min = node
+        self.extract_min()
+
     def _cut(self, node: FibNode, parent: FibNode):
         # Remove node from the parent's child list
         if parent.child == node:
@@ -180,151 +281,336 @@ class FibonacciHeap:
         self.H_min.left_sibling.right_sibling = node
         self.H_min.left_sibling = node
         node.marked = False
+        recorder = metrics.active
+        if recorder is not None:
+            recorder.count("fibonacci_heap.cuts")
 
     def _cascading_cut(self, node: FibNode):
+        # Iterative, a long chain of marked ancestors must not hit the recursion limit
         parent = node.parent
-        if parent:
+        cascaded = 0
+        while parent is not None:
             if not node.marked:
                 node.marked = True
-            else:
-                self._cut(node, parent)
-                self._cascading_cut(parent)
+                break
+            self._cut(node, parent)
+            cascaded += 1
+            node = parent
+            parent = node.parent
+        if cascaded:
+            recorder = metrics.active
+            if recorder is not None:
+                recorder.count("fibonacci_heap.cascading_cuts", cascaded)
 
 
-import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+# Slot number standing for "no node" in the CompactFibonacciHeap link arrays
+NIL: int = -1
+# CompactFibonacciHeap handles keep the slot in the low SLOT_BITS bits and its generation above them
+SLOT_BITS: int = 32
+SLOT_MASK: int = (1 << SLOT_BITS) - 1
+GENERATION_MASK: int = 0xFFFFFFFF
 
 
-class FibonacciHeapVisualizer:
-    def __init__(self, heap: FibonacciHeap):
-        self.heap = heap
-        self.graph = nx.DiGraph()
+class CompactFibonacciHeap:
+    """FibonacciHeap stored as parallel arrays, one slot per entry instead of one FibNode object.
 
-    def visualize(self):
-        self.graph.clear()
-        if self.heap.H_min is None:
-            plt.figure(figsize=(8, 6))
-            plt.title("Empty Fibonacci Heap")
-            plt.text(0.5, 0.5, "Empty Heap", ha='center', va='center', fontsize=14)
-            plt.axis('off')
-            plt.show()
-            return
+    Links take 4 bytes each and degree and mark one byte each, so an entry costs about a third of a
+    FibNode, for roughly half the speed. Removed slots go on a free list and are reused, so the arrays
+    only grow to the largest live size. A handle is its slot plus the slot's generation in the bits
+    above SLOT_BITS, the generation changes on every removal so stale handles are still rejected.
+    """
 
-        # Add all nodes from root list and their children
-        self._add_nodes_from_root_list()
-
-        # Create a better layout
-        pos = nx.kamada_kawai_layout(self.graph)
-
-        # Draw the graph with different node colors based on properties
-        plt.figure(figsize=(12, 10))
-
-        # Draw nodes
-        root_nodes = [n for n, d in self.graph.nodes(data=True) if d.get('is_root', False)]
-        marked_nodes = [n for n, d in self.graph.nodes(data=True) if d.get('marked', False)]
-        normal_nodes = [n for n in self.graph.nodes() if n not in root_nodes and n not in marked_nodes]
-        min_node = self.heap.H_min.key if self.heap.H_min else None
-
-        # Draw edges with different styles
-        sibling_edges = [(u, v) for u, v, d in self.graph.edges(data=True) if d.get('type') == 'sibling']
-        child_edges = [(u, v) for u, v, d in self.graph.edges(data=True) if d.get('type') == 'child']
-
-        # Draw edges
-        nx.draw_networkx_edges(self.graph, pos, edgelist=child_edges, arrows=True,
-                               arrowstyle='->', arrowsize=15, edge_color='black')
-        nx.draw_networkx_edges(self.graph, pos, edgelist=sibling_edges, arrows=True,
-                               style='dashed', arrowstyle='->', arrowsize=10, edge_color='blue')
-
-        # Draw nodes with different colors
-        nx.draw_networkx_nodes(self.graph, pos, nodelist=normal_nodes, node_size=700,
-                               node_color='lightblue', edgecolors='black')
-        nx.draw_networkx_nodes(self.graph, pos, nodelist=marked_nodes, node_size=700,
-                               node_color='lightgrey', edgecolors='black')
-        nx.draw_networkx_nodes(self.graph, pos, nodelist=root_nodes, node_size=700,
-                               node_color='lightgreen', edgecolors='black')
-        if min_node is not None:
-            nx.draw_networkx_nodes(self.graph, pos, nodelist=[min_node], node_size=800,
-                                   node_color='yellow', edgecolors='red', linewidths=3)
-
-        # Draw node labels
-        node_labels = {n: f"{n}\nd:{d.get('degree', 0)}" +
-                          (f"\n(M)" if d.get('marked', False) else "") for n, d in self.graph.nodes(data=True)}
-        nx.draw_networkx_labels(self.graph, pos, labels=node_labels)
-
-        # Add legend
-        legend_elements = [
-            mpatches.Patch(color='lightblue', label='Regular Node'),
-            mpatches.Patch(color='lightgreen', label='Root Node'),
-            mpatches.Patch(color='lightgrey', label='Marked Node'),
-            mpatches.Patch(color='yellow', label='Minimum Node'),
-        ]
-        plt.legend(handles=legend_elements, loc='upper right')
-
-        plt.title("Fibonacci Heap Visualization")
-        plt.axis('off')
-        plt.tight_layout()
-        plt.show()
-
-    def _add_nodes_from_root_list(self):
-        if not self.heap.H_min:
+    def __init__(self):
+        self.min: int = NIL
+        self.size: int = 0
+        self.keys: list = []
+        self.values: list = []
+        self.parent: array = array('i')  # A slot that is its own parent is free
+        self.child: array = array('i')
+        self.left: array = array('i')
+        self.right: array = array('i')
+        self.degree: bytearray = bytearray()
+        self.marked: bytearray = bytearray()
+        self.generation: array = array('I')  # Bumped every time the slot is freed
+        self.free: array = array('i')  # Free slots, reused last in first out
+        self._degree_table: List[int] = []  # Reusable consolidate buckets
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key, value=None) -> int:
+        """Inserts key with a payload and returns its handle for decrease_key and delete."""
+        if self.free:
+            slot = self.free.pop()
+            self.keys[slot] = key
+            self.values[slot] = value
+            self.parent[slot] = NIL
+            self.child[slot] = NIL
+            self.left[slot] = self.right[slot] = slot
+            self.degree[slot] = 0
+            self.marked[slot] = 0
+        else:
+            slot = len(self.keys)
+            self.keys.append(key)
+            self.values.append(value)
+            self.parent.append(NIL)
+            self.child.append(NIL)
+            self.left.append(slot)
+            self.right.append(slot)
+            self.degree.append(0)
+            self.marked.append(0)
+            self.generation.append(0)
+        self._add_roots(slot, slot, slot)
+        self.size += 1
+        return (self.generation[slot] << SLOT_BITS) | slot
+
+    def heapify(self, items: Iterable[Tuple[Any, Any]]) -> range:
+        """Adds (key, value) pairs as one run of roots in a single pass. Returns their handles.
+
+        The run always takes new slots at the end, generation 0, so its handles are consecutive.
+        """
+        start = len(self.keys)
+        for key, value in items:
+            self.keys.append(key)
+            self.values.append(value)
+        stop = len(self.keys)
+        if start == stop:
+            return range(start, stop)
+        count = stop - start
+        self.parent.extend(array('i', [NIL]) * count)
+        self.child.extend(array('i', [NIL]) * count)
+        # Each new root points at its neighbours in the run, the ends are closed into a circle below
+        self.left.extend(range(start - 1, stop - 1))
+        self.right.extend(range(start + 1, stop + 1))
+        self.degree.extend(bytes(count))
+        self.marked.extend(bytes(count))
+        self.generation.extend(array('I', [0]) * count)
+        self.left[start] = stop - 1
+        self.right[stop - 1] = start
+        minimum = min(range(start, stop), key=self.keys.__getitem__)
+        self._add_roots(start, stop - 1, minimum)
+        self.size += count
+        return range(start, stop)
+
+    def peek(self) -> Optional[Tuple[Any, Any]]:
+        """Returns (key, value) of the minimum without removing it, None when empty."""
+        if self.min == NIL:
+            return None
+        return self.keys[self.min], self.values[self.min]
+
+    def pop(self) -> Tuple[Any, Any]:
+        """Removes the minimum and returns its (key, value)."""
+        slot = self._extract_min()
+        if slot == NIL:
+            raise IndexError("pop from an empty heap")
+        return self._release(slot)
+
+    def entry(self, handle: int) -> Tuple[Any, Any]:
+        """Returns (key, value) of a handle still in the heap."""
+        slot = self._slot(handle)
+        return self.keys[slot], self.values[slot]
+
+    def decrease_key(self, handle: int, new_key):
+        slot = self._slot(handle)
+        keys = self.keys
+        if new_key > keys[slot]:
+            raise ValueError("New key must be smaller than the current key.")
+        keys[slot] = new_key
+        parent = self.parent[slot]
+        if parent != NIL and new_key < keys[parent]:
+            self._cut(slot, parent)
+            self._cascading_cut(parent)
+        if new_key < keys[self.min]:
+            self.min = slot
+
+    def delete(self, handle: int):
+        """Removes a handle from the heap."""
+        slot = self._slot(handle)
+        parent = self.parent[slot]
+        if parent != NIL:
+            self._cut(slot, parent)
+            self._cascading_cut(parent)
+        self.min = slot
+        self._release(self._extract_min())
+
+    def _extract_min(self) -> int:
+        # Unlinks the minimum and returns its slot, NIL when empty, _release frees it
+        min_slot = self.min
+        if min_slot == NIL:
+            return NIL
+        left, right = self.left, self.right
+
+        child = self.child[min_slot]
+        following = right[min_slot]
+        if following == min_slot:
+            start = child
+        else:
+            # Remove the minimum from the root list and splice its child list in its place
+            previous = left[min_slot]
+            right[previous] = following
+            left[following] = previous
+            if child != NIL:
+                child_last = left[child]
+                right[previous] = child
+                left[child] = previous
+                right[child_last] = following
+                left[following] = child_last
+            start = following
+
+        if start == NIL:
+            self.min = NIL
+        else:
+            self.consolidate(start)
+
+        self.size -= 1
+        self.child[min_slot] = NIL
+        left[min_slot] = right[min_slot] = min_slot
+        self.parent[min_slot] = min_slot
+        return min_slot
+
+    def consolidate(self, current: int):
+        # Same linking as FibonacciHeap.consolidate, over slots instead of nodes
+        table = self._degree_table
+        needed = self.size.bit_length() * 2 + 2
+        if len(table) < needed:
+            table.extend([NIL] * (needed - len(table)))
+        keys, parent, child, left, right = self.keys, self.parent, self.child, self.left, self.right
+        degrees, marked = self.degree, self.marked
+
+        right[left[current]] = NIL
+        max_degree = 0
+        roots = 0
+        while current != NIL:
+            roots += 1
+            node = current
+            current = right[node]
+            parent[node] = NIL
+            marked[node] = 0
+            degree = degrees[node]
+            other = table[degree]
+            while other != NIL:
+                table[degree] = NIL
+                if keys[other] < keys[node]:
+                    node, other = other, node
+                parent[other] = node
+                marked[other] = 0
+                first_child = child[node]
+                if first_child == NIL:
+                    child[node] = other
+                    left[other] = right[other] = other
+                else:
+                    right[other] = right[first_child]
+                    left[other] = first_child
+                    left[right[first_child]] = other
+                    right[first_child] = other
+                degree += 1
+                degrees[node] = degree
+                other = table[degree]
+            table[degree] = node
+            if degree > max_degree:
+                max_degree = degree
+
+        h_min = first = last = NIL
+        remaining = 0
+        for degree in range(max_degree + 1):
+            node = table[degree]
+            if node == NIL:
+                continue
+            table[degree] = NIL
+            remaining += 1
+            if first == NIL:
+                first = node
+            else:
+                right[last] = node
+                left[node] = last
+            last = node
+            if h_min == NIL or keys[node] < keys[h_min]:
+                h_min = node
+        right[last] = first
+        left[first] = last
+        self.min = h_min
+
+        recorder = metrics.active
+        if recorder is not None:
+            recorder.count("fibonacci_heap.links", roots - remaining)
+            recorder.maximum("fibonacci_heap.max_root_list", roots)
+
+    def _slot(self, handle: int) -> int:
+        slot = handle & SLOT_MASK
+        if (handle < 0 or slot >= len(self.keys) or self.parent[slot] == slot
+                or self.generation[slot] != handle >> SLOT_BITS):
+            raise ValueError("Handle is not in the heap")
+        return slot
+
+    def _release(self, slot: int) -> Tuple[Any, Any]:
+        # Drops the key and value references and frees the slot, stale handles keep the old generation
+        item = self.keys[slot], self.values[slot]
+        self.keys[slot] = self.values[slot] = None
+        self.generation[slot] = (self.generation[slot] + 1) & GENERATION_MASK
+        self.free.append(slot)
+        return item
+
+    def _add_roots(self, first: int, last: int, minimum: int):
+        # Splices the circular run first..last into the root list after the minimum
+        h_min = self.min
+        if h_min == NIL:
+            self.min = minimum
             return
-
-        start = self.heap.H_min
-        current = start
-
-        # Process all nodes in the root list
-        while True:
-            self._add_node_and_children(current, is_root=True)
-            current = current.right_sibling
-            if current == start:
-                break
-
-        # Add sibling connections
-        current = start
-        while True:
-            next_node = current.right_sibling
-            if current != next_node:  # Skip self-loops
-                self.graph.add_edge(current.key, next_node.key, type='sibling')
-            current = next_node
-            if current == start:
+        left, right = self.left, self.right
+        following = right[h_min]
+        right[h_min] = first
+        left[first] = h_min
+        right[last] = following
+        left[following] = last
+        if self.keys[minimum] < self.keys[h_min]:
+            self.min = minimum
+
+    def _cut(self, node: int, parent: int):
+        left, right = self.left, self.right
+        if self.child[parent] == node:
+            self.child[parent] = NIL if right[node] == node else right[node]
+        right[left[node]] = right[node]
+        left[right[node]] = left[node]
+        self.degree[parent] -= 1
+
+        self.parent[node] = NIL
+        h_min = self.min
+        left[node] = left[h_min]
+        right[node] = h_min
+        right[left[h_min]] = node
+        left[h_min] = node
+        self.marked[node] = 0
+        recorder = metrics.active
+        if recorder is not None:
+            recorder.count("fibonacci_heap.cuts")
+
+    def _cascading_cut(self, node: int):
+        parent = self.parent[node]
+        cascaded = 0
+        while parent != NIL:
+            if not self.marked[node]:
+                self.marked[node] = 1
                 break
+            self._cut(node, parent)
+            cascaded += 1
+            node = parent
+            parent = self.parent[node]
+        if cascaded:
+            recorder = metrics.active
+            if recorder is not None:
+                recorder.count("fibonacci_heap.cascading_cuts", cascaded)
+
+
+def __getattr__(name: str):
+    # The visualizer lives in its own module so importing the heap never loads networkx or matplotlib
+    if name == "FibonacciHeapVisualizer":
+        try:
+            from .fibonacci_heap_visualizer import FibonacciHeapVisualizer
+        except ImportError:
+            from fibonacci_heap_visualizer import FibonacciHeapVisualizer
+        return FibonacciHeapVisualizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def _add_node_and_children(self, node, is_root=False, parent=None):
-        if node is None:
-            return
-
-        # Add the node with its attributes
-        self.graph.add_node(node.key,
-                            is_root=is_root,
-                            degree=node.degree,
-                            marked=node.marked)
-
-        # Connect with parent if exists
-        if parent:
-            self.graph.add_edge(parent.key, node.key, type='child')
-
-        # Process children if any
-        if node.child:
-            child = node.child
-            start_child = child
-
-            # Add all children
-            while True:
-                self._add_node_and_children(child, is_root=False, parent=node)
-                child = child.right_sibling
-                if child == start_child:
-                    break
-
-            # Connect siblings
-            child = start_child
-            while True:
-                next_child = child.right_sibling
-                if child != next_child:  # Skip self-loops
-                    self.graph.add_edge(child.key, next_child.key, type='sibling')
-                child = next_child
-                if child == start_child:
-                    break
 
 # Example usage
 if __name__ == "__main__":
@@ -332,23 +618,14 @@ if __name__ == "__main__":
     fib_heap = FibonacciHeap()
 
     # Insert nodes
-    node1 = FibNode()
-    node1.key = 10
-    fib_heap.insert(node1)
-
-    node2 = FibNode()
-    node2.key = 5
-    fib_heap.insert(node2)
-
-    node3 = FibNode()
-    node3.key = 20
-    fib_heap.insert(node3)
-
-    print(fib_heap.extract_min())
-
-    # Visualize the heap
-    visualizer = FibonacciHeapVisualizer(fib_heap)
-    visualizer.visualize()
-
+    fib_heap.push(10, "ten")
+    handle = fib_heap.push(20, "twenty")
+    fib_heap.heapify([(5, "five"), (30, "thirty"), (40, "forty")])
 
+    print(fib_heap.pop())
+    fib_heap.decrease_key(handle, 1)
+    print(len(fib_heap), fib_heap.peek())
 
+    # Text outline, fibonacci_heap_visualizer also draws it with matplotlib
+    from fibonacci_heap_visualizer import to_text
+    print(to_text(fib_heap))
@@ -0,0 +1,227 @@
+import json
+from typing import Any
+
+try:
+    from .fibonacci_heap import FibNode, FibonacciHeap
+except ImportError:
+    from fibonacci_heap import FibNode, FibonacciHeap
+
+
+def _siblings(start: FibNode):
+    # Walks a circular sibling list once
+    node = start
+    while node is not None:
+        yield node
+        node = node.right_sibling
+        if node is start:
+            return
+
+
+def heap_snapshot(heap: FibonacciHeap) -> dict[str, Any]:
+    """Plain dict of the heap: size and the root list as nested trees, the minimum root comes first."""
+    def tree(node: FibNode) -> dict[str, Any]:
+        return {
+            "key": node.key,
+            "value": node.value,
+            "degree": node.degree,
+            "marked": node.marked,
+            "children": [tree(child) for child in _siblings(node.child)],
+        }
+
+    return {"size": len(heap), "roots": [tree(root) for root in _siblings(heap.H_min)]}
+
+
+def to_text(heap: FibonacciHeap) -> str:
+    """Indented outline of the trees, the minimum is first and marked nodes end with (M)."""
+    lines = [f"FibonacciHeap size={len(heap)}"]
+    stack = [(root, 1) for root in reversed(list(_siblings(heap.H_min)))]
+    while stack:
+        node, depth = stack.pop()
+        lines.append(f"{'  ' * depth}{node.key!r} d:{node.degree}{' (M)' if node.marked else ''}")
+        stack.extend((child, depth + 1) for child in reversed(list(_siblings(node.child))))
+    return "\n".join(lines)
+
+
+def to_dot(heap: FibonacciHeap) -> str:
+    """Graphviz source with child edges solid and root list links dashed."""
+    lines = ["digraph FibonacciHeap {", "  node [shape=circle];"]
+    ids = {}
+
+    def add(node: FibNode, is_root: bool):
+        ids[node] = name = f"n{len(ids)}"
+        label = json.dumps(f"{node.key!r}\nd:{node.degree}")
+        style = ', style=filled, fillcolor="lightgrey"' if node.marked else ""
+        if node is heap.H_min:
+            style = ', style=filled, fillcolor="yellow"'
+        elif is_root and not node.marked:
+            style = ', style=filled, fillcolor="lightgreen"'
+        lines.append(f"  {name} [label={label}{style}];")
+        for child in _siblings(node.child):
+            add(child, False)
+            lines.append(f"  {name} -> {ids[child]};")
+
+    roots = list(_siblings(heap.H_min))
+    for root in roots:
+        add(root, True)
+    for left, right in zip(roots, roots[1:]):
+        lines.append(f"  {ids[left]} -> {ids[right]} [style=dashed, arrowhead=none];")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def to_json(heap: FibonacciHeap, **kwargs) -> str:
+    """heap_snapshot as JSON, keys and values that JSON cannot hold are written with repr."""
+    kwargs.setdefault("default", repr)
+    return json.dumps(heap_snapshot(heap), **kwargs)
+
+
+class FibonacciHeapVisualizer:
+    """Draws a heap with networkx and matplotlib, both imported on the first visualize call."""
+
+    def __init__(self, heap: FibonacciHeap):
+        self.heap = heap
+        self.graph = None  # networkx.DiGraph, built by visualize
+
+    def visualize(self):
+        try:
+            import networkx as nx
+            import matplotlib.pyplot as plt
+            import matplotlib.patches as mpatches
+        except ImportError as error:
+            raise ImportError("FibonacciHeapVisualizer needs networkx and matplotlib, "
+                              "to_text, to_dot and to_json work without them") from error
+
+        self.graph = nx.DiGraph()
+        if self.heap.H_min is None:
+            plt.figure(figsize=(8, 6))
+            plt.title("Empty Fibonacci Heap")
+            plt.text(0.5, 0.5, "Empty Heap", ha='center', va='center', fontsize=14)
+            plt.axis('off')
+            plt.show()
+            return
+
+        # Add all nodes from root list and their children
+        self._add_nodes_from_root_list()
+
+        # Create a better layout
+        pos = nx.kamada_kawai_layout(self.graph)
+
+        # Draw the graph with different node colors based on properties
+        plt.figure(figsize=(12, 10))
+
+        # Draw nodes
+        root_nodes = [n for n, d in self.graph.nodes(data=True) if d.get('is_root', False)]
+        marked_nodes = [n for n, d in self.graph.nodes(data=True) if d.get('marked', False)]
+        normal_nodes = [n for n in self.graph.nodes() if n not in root_nodes and n not in marked_nodes]
+        min_node = self.heap.H_min.key if self.heap.H_min else None
+
+        # Draw edges with different styles
+        sibling_edges = [(u, v) for u, v, d in self.graph.edges(data=True) if d.get('type') == 'sibling']
+        child_edges = [(u, v) for u, v, d in self.graph.edges(data=True) if d.get('type') == 'child']
+
+        # Draw edges
+        nx.draw_networkx_edges(self.graph, pos, edgelist=child_edges, arrows=True,
+                               arrowstyle='->', arrowsize=15, edge_color='black')
+        nx.draw_networkx_edges(self.graph, pos, edgelist=sibling_edges, arrows=True,
+                               style='dashed', arrowstyle='->', arrowsize=10, edge_color='blue')
+
+        # Draw nodes with different colors
+        nx.draw_networkx_nodes(self.graph, pos, nodelist=normal_nodes, node_size=700,
+                               node_color='lightblue', edgecolors='black')
+        nx.draw_networkx_nodes(self.graph, pos, nodelist=marked_nodes, node_size=700,
+                               node_color='lightgrey', edgecolors='black')
+        nx.draw_networkx_nodes(self.graph, pos, nodelist=root_nodes, node_size=700,
+                               node_color='lightgreen', edgecolors='black')
+        if min_node is not None:
+            nx.draw_networkx_nodes(self.graph, pos, nodelist=[min_node], node_size=800,
+                                   node_color='yellow', edgecolors='red', linewidths=3)
+
+        # Draw node labels
+        node_labels = {n: f"{n}\nd:{d.get('degree', 0)}" +
+                          (f"\n(M)" if d.get('marked', False) else "") for n, d in self.graph.nodes(data=True)}
+        nx.draw_networkx_labels(self.graph, pos, labels=node_labels)
+
+        # Add legend
+        legend_elements = [
+            mpatches.Patch(color='lightblue', label='Regular Node'),
+            mpatches.Patch(color='lightgreen', label='Root Node'),
+            mpatches.Patch(color='lightgrey', label='Marked Node'),
+            mpatches.Patch(color='yellow', label='Minimum Node'),
+        ]
+        plt.legend(handles=legend_elements, loc='upper right')
+
+        plt.title("Fibonacci Heap Visualization")
+        plt.axis('off')
+        plt.tight_layout()
+        plt.show()
+
+    def _add_nodes_from_root_list(self):
+        if not self.heap.H_min:
+            return
+
+        start = self.heap.H_min
+        current = start
+
+        # Process all nodes in the root list
+        while True:
+            self._add_node_and_children(current, is_root=True)
+            current = current.right_sibling
+            if current == start:
+                break
+
+        # Add sibling connections
+        current = start
+        while True:
+            next_node = current.right_sibling
+            if current != next_node:  # Skip self-loops
+                self.graph.add_edge(current.key, next_node.key, type='sibling')
+            current = next_node
+            if current == start:
+                break
+
+    def _add_node_and_children(self, node, is_root=False, parent=None):
+        if node is None:
+            return
+
+        # Add the node with its attributes
+        self.graph.add_node(node.key,
+                            is_root=is_root,
+                            degree=node.degree,
+                            marked=node.marked)
+
+        # Connect with parent if exists
+        if parent:
+            self.graph.add_edge(parent.key, node.key, type='child')
+
+        # Process children if any
+        if node.child:
+            child = node.child
+            start_child = child
+
+            # Add all children
+            while True:
+                self._add_node_and_children(child, is_root=False, parent=node)
+                child = child.right_sibling
+                if child == start_child:
+                    break
+
+            # Connect siblings
+            child = start_child
+            while True:
+                next_child = child.right_sibling
+                if child != next_child:  # Skip self-loops
+                    self.graph.add_edge(child.key, next_child.key, type='sibling')
+                child = next_child
+                if child == start_child:
+                    break
+
+
+if __name__ == "__main__":
+    fib_heap = FibonacciHeap()
+    fib_heap.heapify((key, None) for key in (10, 20, 5, 30, 40, 3, 8))
+    handle = fib_heap.push(25)
+    fib_heap.pop()
+    fib_heap.decrease_key(handle, 1)
+    print(to_text(fib_heap))
+    print(to_dot(fib_heap))
+    FibonacciHeapVisualizer(fib_heap).visualize()
@@ -0,0 +1,125 @@
+from array import array
+from collections import Counter
+
+try:
+    from .BWT import BWT
+except ImportError:
+    from BWT import BWT
+
+
+class FMIndex:
+    """Substring search over a BWT without keeping the text or the full suffix array.
+
+    Occurrence counts are checkpointed every occ_sample rows, and the suffix array is kept only for
+    rows whose text position is a multiple of sa_sample.
+    """
+
+    def __init__(self, bwt: BWT, occ_sample: int = 128, sa_sample: int = 32):
+        if not bwt.last_column:
+            bwt.transform()
+        self.last_column = bwt.last_column
+        self.primary_index: int = bwt.primary_index  # Row whose last character is the sentinel
+        self.sentinel = self.last_column[self.primary_index]
+        self.occ_sample: int = occ_sample
+        self.sa_sample: int = sa_sample
+        n = len(self.last_column)
+
+        # C table: first row of every character, row 0 belongs to the sentinel
+        counts = Counter(self.last_column)
+        counts[self.sentinel] -= 1
+        self.first_row: dict = {}
+        row = 1
+        for char in sorted(counts):
+            if counts[char]:
+                self.first_row[char] = row
+                row += counts[char]
+
+        # checkpoints[char][k] is the number of char in last_column[:k * occ_sample]
+        self.checkpoints: dict = {char: array('i', [0]) for char in self.first_row}
+        running = dict.fromkeys(self.first_row, 0)
+        for start in range(0, n, occ_sample):
+            for char, count in Counter(self.last_column[start:start + occ_sample]).items():
+                if char in running:
+                    running[char] += count
+            for char, checkpoint in self.checkpoints.items():
+                checkpoint.append(running[char])
+
+        # Suffix array samples, in row order, for rows holding a multiple of sa_sample
+        self.sampled: bytearray = bytearray(n)
+        self.samples: array = array('i')
+        for row, position in enumerate(bwt.suffix_array):
+            if position % sa_sample == 0:
+                self.sampled[row] = 1
+                self.samples.append(position)
+        # Number of sampled rows before every block of occ_sample rows
+        self.sample_ranks: array = array('i', [0])
+        for start in range(0, n, occ_sample):
+            self.sample_ranks.append(self.sample_ranks[-1] + self.sampled.count(1, start, start + occ_sample))
+
+    @classmethod
+    def from_text(cls, text, occ_sample: int = 128, sa_sample: int = 32, method: str = "sais") -> 'FMIndex':
+        """Transforms text and indexes it."""
+        bwt = BWT(text, method)
+        bwt.transform()
+        return cls(bwt, occ_sample, sa_sample)
+
+    def occ(self, char, row: int) -> int:
+        """Number of char in last_column[:row], not counting the sentinel."""
+        checkpoint = self.checkpoints.get(char)
+        if checkpoint is None:
+            return 0
+        block = row // self.occ_sample
+        start = block * self.occ_sample
+        count = checkpoint[block] + self.last_column.count(char, start, row)
+        if char == self.sentinel and self.primary_index < row:
+            count -= 1
+        return count
+
+    def lf(self, row: int) -> int:
+        """Row of the rotation starting one character before the rotation at row."""
+        if row == self.primary_index:
+            return 0
+        char = self.last_column[row]
+        return self.first_row[char] + self.occ(char, row)
+
+    def rows(self, pattern) -> tuple[int, int]:
+        """Backward search: the rows [start, end) whose rotations start with pattern."""
+        if not pattern:
+            # Every row, the sentinel's included, would match
+            raise ValueError("Pattern must not be empty")
+        start, end = 0, len(self.last_column)
+        for char in reversed(pattern):
+            first = self.first_row.get(char)
+            if first is None:
+                return 0, 0
+            start = first + self.occ(char, start)
+            end = first + self.occ(char, end)
+            if start >= end:
+                return 0, 0
+        return start, end
+
+    def count(self, pattern) -> int:
+        """Number of occurrences of pattern in the text."""
+        start, end = self.rows(pattern)
+        return end - start
+
+    def suffix_at(self, row: int) -> int:
+        """Text position of the rotation at row, walking LF to the nearest sample."""
+        steps = 0
+        while not self.sampled[row]:
+            row = self.lf(row)
+            steps += 1
+        block = row // self.occ_sample
+        rank = self.sample_ranks[block] + self.sampled.count(1, block * self.occ_sample, row)
+        return self.samples[rank] + steps
+
+    def locate(self, pattern) -> list[int]:
+        """Sorted start positions of pattern in the text."""
+        start, end = self.rows(pattern)
+        return sorted(self.suffix_at(row) for row in range(start, end))
+
+
+if __name__ == "__main__":
+    index = FMIndex.from_text("abcabcabacbabacbabccc", occ_sample=4, sa_sample=4)
+    print(index.count("ba"))
+    print(index.locate("ba"))
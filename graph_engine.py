@@ -0,0 +1,159 @@
+from array import array
+from typing import Iterable, Tuple
+
+try:
+    from .priority_queues import make_queue
+except ImportError:
+    from priority_queues import make_queue
+
+
+class CSRGraph:
+    """Adjacency in compressed sparse row form.
+
+    The edges leaving vertex u are targets[offsets[u]:offsets[u + 1]] with the matching weights.
+    """
+
+    def __init__(self, offsets: array, targets: array, weights: array):
+        if len(targets) != len(weights) or not offsets or offsets[-1] != len(targets):
+            raise ValueError("offsets, targets and weights do not describe the same edges")
+        self.offsets: array = offsets
+        self.targets: array = targets
+        self.weights: array = weights
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @classmethod
+    def from_edges(cls, vertex_count: int, edges: Iterable[Tuple[int, int, float]], directed: bool = False) -> 'CSRGraph':
+        """Builds the graph from (source, target, weight) triples, undirected edges are stored both ways."""
+        sources = array('i')
+        targets = array('i')
+        weights = []
+        for source, target, weight in edges:
+            if not (0 <= source < vertex_count and 0 <= target < vertex_count):
+                raise ValueError(f"Edge ({source}, {target}) has a vertex outside [0, {vertex_count})")
+            sources.append(source)
+            targets.append(target)
+            weights.append(weight)
+        if not directed:
+            sources, targets = sources + targets, targets + sources
+            weights += weights
+        # Int weights stay exact, anything else is stored as double
+        typecode = 'q' if all(type(weight) is int for weight in weights) else 'd'
+
+        # Counting sort of the edges by source
+        offsets = array('q', bytes(8 * (vertex_count + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for u in range(vertex_count):
+            offsets[u + 1] += offsets[u]
+        position = offsets[:-1]
+        sorted_targets = array('i', bytes(4 * len(targets)))
+        sorted_weights = array(typecode, [0]) * len(targets)
+        for source, target, weight in zip(sources, targets, weights):
+            slot = position[source]
+            sorted_targets[slot] = target
+            sorted_weights[slot] = weight
+            position[source] = slot + 1
+        return cls(offsets, sorted_targets, sorted_weights)
+
+
+def dijkstra(graph: CSRGraph, source: int, queue="fibonacci") -> Tuple[list, array]:
+    """Single source shortest paths with decrease_key on an addressable queue (see priority_queues).
+
+    Returns the distance of every vertex (None when unreachable) and its predecessor (-1 for none).
+    """
+    n = graph.vertex_count
+    if not 0 <= source < n:
+        raise ValueError(f"Source {source} is not a vertex")
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    if weights and min(weights) < 0:
+        raise ValueError("Dijkstra needs non-negative weights")
+
+    heap = make_queue(queue)
+    push, pop, decrease_key = heap.push, heap.pop, heap.decrease_key
+    distance = [None] * n
+    previous = array('i', [-1]) * n
+    handles = [None] * n
+    done = bytearray(n)
+    distance[source] = 0
+    handles[source] = push(0, source)
+    while len(heap):
+        d, u = pop()
+        done[u] = 1
+        for edge in range(offsets[u], offsets[u + 1]):
+            v = targets[edge]
+            if done[v]:
+                continue
+            candidate = d + weights[edge]
+            handle = handles[v]
+            if handle is None:
+                distance[v] = candidate
+                previous[v] = u
+                handles[v] = push(candidate, v)
+            elif candidate < distance[v]:
+                distance[v] = candidate
+                previous[v] = u
+                decrease_key(handle, candidate)
+    return distance, previous
+
+
+def prim(graph: CSRGraph, queue="fibonacci") -> Tuple[float, array]:
+    """Minimum spanning forest of an undirected graph, one tree grown per connected component.
+
+    Returns the total weight and the parent of every vertex in its tree (-1 for the roots).
+    Keys are edge weights and are not monotone, so the radix queue does not apply.
+    """
+    n = graph.vertex_count
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    parent = array('i', [-1]) * n
+    best: list = [None] * n  # Lightest known edge into the tree
+    handles = [None] * n
+    done = bytearray(n)
+    total = 0
+    for root in range(n):
+        if done[root]:
+            continue
+        heap = make_queue(queue)
+        push, pop, decrease_key = heap.push, heap.pop, heap.decrease_key
+        handles[root] = push(0, root)
+        while len(heap):
+            key, u = pop()
+            done[u] = 1
+            total += key
+            for edge in range(offsets[u], offsets[u + 1]):
+                v = targets[edge]
+                if done[v]:
+                    continue
+                weight = weights[edge]
+                handle = handles[v]
+                if handle is None:
+                    best[v] = weight
+                    parent[v] = u
+                    handles[v] = push(weight, v)
+                elif weight < best[v]:
+                    best[v] = weight
+                    parent[v] = u
+                    decrease_key(handle, weight)
+    return total, parent
+
+
+def shortest_path(previous: array, target: int) -> list[int]:
+    """Vertices from the source to target along the predecessors dijkstra returned, [target] when unreached."""
+    path = [target]
+    while previous[path[-1]] != -1:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
+
+
+if __name__ == "__main__":
+    graph = CSRGraph.from_edges(5, [(0, 1, 4), (0, 2, 1), (2, 1, 2), (1, 3, 1), (2, 3, 5), (3, 4, 3)])
+    distance, previous = dijkstra(graph, 0)
+    print(distance, shortest_path(previous, 4))
+    print(prim(graph, "pairing"))
@@ -1,6 +1,74 @@
-from typing import Dict, Optional
+import mmap
+import struct
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
 from heapq import heappush, heappop
 
+try:
+    from . import metrics
+    from .bitstream import BitReader, BitWriter
+    from .memo_cache import memoized
+except ImportError:
+    import metrics
+    from bitstream import BitReader, BitWriter
+    from memo_cache import memoized
+
+# Bits resolved per lookup by CanonicalHuffman.decode, longer codes fall back to a per-length search
+DECODE_TABLE_BITS: int = 11
+# Bytes counted per task by byte_histogram and file_histogram
+HISTOGRAM_CHUNK_SIZE: int = 1 << 22
+
+
+def _count_chunk(chunk) -> list[int]:
+    counts = [0] * 256
+    for char, freq in Counter(chunk).items():
+        counts[char] = freq
+    return counts
+
+
+def _count_file_range(path: str, start: int, stop: int) -> list[int]:
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        counts = [0] * 256
+        for offset in range(start, stop, HISTOGRAM_CHUNK_SIZE):
+            for char, freq in enumerate(_count_chunk(mapped[offset:min(offset + HISTOGRAM_CHUNK_SIZE, stop)])):
+                counts[char] += freq
+        return counts
+
+
+def _merge_histograms(histograms: Iterable[list[int]]) -> list[int]:
+    counts = [0] * 256
+    for histogram in histograms:
+        for char, freq in enumerate(histogram):
+            counts[char] += freq
+    return counts
+
+
+def byte_histogram(data, workers: int = 1, chunk_size: int = HISTOGRAM_CHUNK_SIZE) -> list[int]:
+    """Counts every byte value of a bytes-like object or mmap, chunk_size bytes per task."""
+    view = memoryview(data).cast('B')
+    chunks = (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    if workers <= 1 or len(view) <= chunk_size:
+        return _merge_histograms(_count_chunk(chunk) for chunk in chunks)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        # Chunks are copied to bytes since memoryviews cannot be pickled
+        return _merge_histograms(executor.map(_count_chunk, (bytes(chunk) for chunk in chunks)))
+
+
+def file_histogram(path: str, workers: int = 1, chunk_size: int = HISTOGRAM_CHUNK_SIZE) -> list[int]:
+    """Counts every byte value of a file, each worker maps its own range of the file."""
+    with open(path, 'rb') as file:
+        size = file.seek(0, 2)
+    step = max(chunk_size, -(-size // max(workers, 1)))
+    ranges = [(start, min(start + step, size)) for start in range(0, size, step)]
+    if workers <= 1 or len(ranges) <= 1:
+        return _merge_histograms(_count_file_range(path, start, stop) for start, stop in ranges)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        return _merge_histograms(executor.map(_count_file_range, [path] * len(ranges),
+                                              *zip(*ranges)))
+
 
 class BinaryTree:
     def __init__(self, char: Optional[str] = None, freq: Optional[int] = None):
@@ -13,7 +81,16 @@ class BinaryTree:
         return  self.left and  self.right
 
     def contains(self, i:str):
-        return i in self.char
+        # Walk the subtree, leaves hold the symbols
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.has_child():
+                stack.append(node.left)
+                stack.append(node.right)
+            elif node.char == i:
+                return True
+        return False
 
     def __lt__(self, other: 'BinaryTree'):
         return self.freq < other.freq
@@ -31,16 +108,32 @@ class HuffmanEncoding:
         else:
             self.frequencies[char] = freq
 
-    def build__huffman_tree(self, text: str):
-        # Build frequency dictionary
-        for char in text:
-            self.add_frequency(char, 1)
+    @metrics.timed("huffman.build")
+    @memoized(state=("frequencies", "tree"))
+    def build__huffman_tree(self, text: str, workers: int = 1):
+        """Counts the frequencies of text and builds the tree. Byte data can be counted in a process pool."""
+        self.count_frequencies(text, workers)
+        self.build_tree_from_frequencies()
+
+    def count_frequencies(self, text: str, workers: int = 1):
+        """Replaces the frequencies with the counts of text."""
+        if isinstance(text, (bytes, bytearray, memoryview, mmap.mmap)):
+            histogram = byte_histogram(text, workers)
+            self.frequencies = {char: freq for char, freq in enumerate(histogram) if freq}
+        else:
+            self.frequencies = dict(Counter(text))
 
+    def build_tree_from_frequencies(self):
+        """Builds the tree from the current frequencies."""
         # Create a priority queue (min-heap) for the nodes
         heap = []
         for char, freq in self.frequencies.items():
             heappush(heap, (freq, BinaryTree(char=char, freq=freq)))
 
+        if not heap:
+            self.tree = None
+            return
+
         # Build the Huffman tree
         while len(heap) > 1:
             # Pop two nodes with the smallest frequencies
@@ -48,7 +141,7 @@ class HuffmanEncoding:
             freq2, node2 = heappop(heap)
 
             # Create a new BinaryTree node combining the two
-            new_node = BinaryTree(char=node1.char + node2.char, freq=freq1 + freq2)
+            new_node = BinaryTree(freq=freq1 + freq2)
             new_node.left = node1
             new_node.right = node2
 
@@ -58,22 +151,232 @@ class HuffmanEncoding:
         # The final node is the root of the Huffman tree
         self.tree = heappop(heap)[1]
 
-    def get_huffman_path(self) -> Dict[str, str]:
-        for i in self.frequencies.keys():
-            curr = self.tree
-            while curr.has_child():
-                if curr.left.contains(i):
-                    self.codes[i] = self.codes.get(i, '') + '0'
-                    curr = curr.left
-                else:
-                    self.codes[i] = self.codes.get(i, ' ') +'1'
-                    curr = curr.right
+    def code_lengths(self, max_length: Optional[int] = None) -> Dict[str, int]:
+        """Returns the code length of every symbol, optionally limited to max_length bits."""
+        lengths = {}
+        stack = [(self.tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node.has_child():
+                stack.append((node.left, depth + 1))
+                stack.append((node.right, depth + 1))
+            else:
+                # A lone symbol still needs one bit
+                lengths[node.char] = max(depth, 1)
+
+        if max_length is not None and max(lengths.values()) > max_length:
+            lengths = self._limit_lengths(lengths, max_length)
+        return lengths
+
+    def _limit_lengths(self, lengths: Dict[str, int], max_length: int) -> Dict[str, int]:
+        if len(lengths) > 1 << max_length:
+            raise ValueError(f"{len(lengths)} symbols do not fit in {max_length} bit codes")
+        # Kraft sum scaled by 2 ** max_length, a prefix code needs it to stay within capacity
+        capacity = 1 << max_length
+        lengths = {char: min(length, max_length) for char, length in lengths.items()}
+        kraft = sum(1 << (max_length - length) for length in lengths.values())
+
+        # Lengthen the rarest symbols until the code is valid again
+        by_rarity = sorted(lengths, key=lambda char: (self.frequencies.get(char, 0), -lengths[char]))
+        while kraft > capacity:
+            for char in by_rarity:
+                if lengths[char] < max_length:
+                    lengths[char] += 1
+                    kraft -= 1 << (max_length - lengths[char])
+                    break
+
+        # Hand any slack back to the most frequent symbols
+        for char in reversed(by_rarity):
+            while lengths[char] > 1 and kraft + (1 << (max_length - lengths[char])) <= capacity:
+                kraft += 1 << (max_length - lengths[char])
+                lengths[char] -= 1
+        return lengths
+
+    def canonical(self, max_length: Optional[int] = None) -> 'CanonicalHuffman':
+        """Builds the canonical code for the current tree."""
+        return CanonicalHuffman(self.code_lengths(max_length))
 
+    def get_huffman_path(self) -> Dict[str, str]:
+        """Returns the canonical code of every symbol as a '0'/'1' string."""
+        canonical = self.canonical()
+        self.codes = {char: format(code, f'0{length}b') for char, (code, length) in canonical.codes.items()}
         return self.codes
 
+
+class CanonicalHuffman:
+    """Canonical Huffman code, rebuilt from the code lengths alone.
+
+    Codes are handed out in (length, symbol) order, so storing the lengths is enough to share a table.
+    Symbols are ints for encode/decode, bytes values unless the alphabet goes past 255.
+    """
+
+    def __init__(self, lengths: Dict[int, int]):
+        self.lengths: Dict[int, int] = {char: length for char, length in lengths.items() if length}
+        self.codes: Dict[int, Tuple[int, int]] = {}  # Symbol -> (code, length)
+        self.max_length: int = max(self.lengths.values(), default=0)
+
+        code = 0
+        previous_length = 0
+        self.sorted_symbols: list = sorted(self.lengths, key=lambda char: (self.lengths[char], char))
+        # First code and index into sorted_symbols for each length, used past the lookup table
+        self.first_code: list[int] = [0] * (self.max_length + 2)
+        self.first_index: list[int] = [0] * (self.max_length + 2)
+        self.length_count: list[int] = [0] * (self.max_length + 2)
+        for index, char in enumerate(self.sorted_symbols):
+            length = self.lengths[char]
+            code <<= length - previous_length
+            if length != previous_length:
+                self.first_code[length] = code
+                self.first_index[length] = index
+            self.length_count[length] += 1
+            self.codes[char] = (code, length)
+            previous_length = length
+            code += 1
+        if code > 1 << previous_length:
+            raise ValueError("Code lengths do not form a prefix code")
+
+        self.table_bits: int = min(self.max_length, DECODE_TABLE_BITS)
+        self.table: list[Tuple[int, int]] = self._build_table()
+
+    def _build_table(self) -> list[Tuple[int, int]]:
+        # Every table_bits pattern maps to (symbol, length), or (0, 0) when the code is longer
+        table = [(0, 0)] * (1 << self.table_bits)
+        for char, (code, length) in self.codes.items():
+            if length > self.table_bits:
+                continue
+            shift = self.table_bits - length
+            start = code << shift
+            table[start:start + (1 << shift)] = [(char, length)] * (1 << shift)
+        return table
+
+    def write(self, writer: BitWriter, data: Iterable[int]):
+        """Writes the codes of data to a BitWriter."""
+        writer.write_many(data, self.codes)
+
+    @metrics.timed("huffman.encode")
+    def encode(self, data: Iterable[int]) -> bytes:
+        """Encodes data into packed bytes, zero padded to a whole byte."""
+        writer = BitWriter()
+        writer.write_many(data, self.codes)
+        return writer.getvalue()
+
+    def read(self, reader: BitReader) -> int:
+        """Reads one symbol from a BitReader."""
+        char, length = self.table[reader.peek(self.table_bits)]
+        if length:
+            reader.position += length
+            return char
+        return self._read_long(reader.read_bit)
+
+    def _read_long(self, read_bit) -> int:
+        # Canonical codes of one length are consecutive, so each length is a range check
+        code = 0
+        for length in range(1, self.max_length + 1):
+            code = (code << 1) | read_bit()
+            offset = code - self.first_code[length]
+            if 0 <= offset < self.length_count[length]:
+                return self.sorted_symbols[self.first_index[length] + offset]
+        raise ValueError("Invalid Huffman code")
+
+    @metrics.timed("huffman.decode", argument=None)
+    def decode(self, data, count: int) -> bytes:
+        """Decodes count symbols from packed bytes, into an array('H') if a symbol is past 255."""
+        output = bytearray() if self.max_symbol() < 256 else array('H')
+        BitReader(data).read_interleaved([self.decoder()], output, count)
+        return bytes(output) if isinstance(output, bytearray) else output
+
+    def decoder(self) -> tuple:
+        """(table, table_bits, long_code) of the codes for BitReader.read_many and read_interleaved."""
+        return self.table, self.table_bits, lambda reader: self._read_long(reader.read_bit)
+
+    def max_symbol(self) -> int:
+        return max(self.lengths, default=0)
+
+
+def _encode_stream(lengths: Dict[int, int], data: bytes) -> bytes:
+    return CanonicalHuffman(lengths).encode(data)
+
+
+def _decode_stream(lengths: Dict[int, int], data: bytes, count: int) -> bytes:
+    return CanonicalHuffman(lengths).decode(data, count)
+
+
+class MultiStreamHuffman:
+    """Huffman codes data as several independent streams that share one canonical table.
+
+    Stream k holds bytes k, k + streams, k + 2 * streams, ... so the streams can be encoded and
+    decoded on separate cores and woven back together with slice assignment.
+    Layout: stream count, data size, 4 bit code length for all 256 bytes, each stream's size, the streams.
+    """
+    HEADER = struct.Struct(">BQ")
+    MAX_CODE_LENGTH: int = 15
+
+    def __init__(self, streams: int = 4, workers: int = 1):
+        if not 1 <= streams <= 255:
+            raise ValueError("Stream count must be between 1 and 255")
+        self.streams: int = streams
+        self.workers: int = workers
+
+    def encode(self, data) -> bytes:
+        data = bytes(data)
+        encoding = HuffmanEncoding()
+        encoding.build__huffman_tree(data, self.workers)
+        lengths = encoding.code_lengths(self.MAX_CODE_LENGTH) if data else {}
+        parts = [data[k::self.streams] for k in range(self.streams)]
+        encoded = self._map(_encode_stream, [lengths] * self.streams, parts)
+
+        table = BitWriter()
+        for char in range(256):
+            table.write(lengths.get(char, 0), 4)
+        sizes = struct.pack(f">{self.streams}Q", *(len(stream) for stream in encoded))
+        return self.HEADER.pack(self.streams, len(data)) + table.getvalue() + sizes + b"".join(encoded)
+
+    def decode(self, blob) -> bytes:
+        blob = bytes(blob)
+        streams, size = self.HEADER.unpack_from(blob)
+        position = self.HEADER.size
+        table = BitReader(blob[position:position + 128])
+        lengths = {char: length for char, length in ((char, table.read(4)) for char in range(256)) if length}
+        position += 128
+        sizes = struct.unpack_from(f">{streams}Q", blob, position)
+        position += 8 * streams
+
+        parts = []
+        for stream_size in sizes:
+            parts.append(blob[position:position + stream_size])
+            position += stream_size
+        # Stream k holds the ceiling of (size - k) / streams bytes
+        counts = [len(range(k, size, streams)) for k in range(streams)]
+        decoded = self._map(_decode_stream, [lengths] * streams, parts, counts)
+
+        output = bytearray(size)
+        for k, part in enumerate(decoded):
+            output[k::streams] = part
+        return bytes(output)
+
+    def _map(self, function, *arguments) -> list:
+        if self.workers <= 1 or self.streams == 1:
+            return list(map(function, *arguments))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(min(self.workers, self.streams)) as executor:
+            return list(executor.map(function, *arguments))
+
+
 if __name__ == "__main__":
 
     encoding = HuffmanEncoding()
     text = "A_DEAD_DAD_CEDED_A_BAD_BABE_A_BEADED_ABACA_BED"
     encoding.build__huffman_tree(text)
-    print(encoding.get_huffman_path())
\ No newline at end of file
+    print(encoding.get_huffman_path())
+
+    data = text.encode()
+    encoding = HuffmanEncoding()
+    encoding.build__huffman_tree(data)
+    canonical = encoding.canonical(max_length=4)
+    packed = canonical.encode(data)
+    print(len(data), len(packed))
+    print(canonical.decode(packed, len(data)))
+
+    multi = MultiStreamHuffman(streams=4)
+    packed = multi.encode(data)
+    print(len(packed), multi.decode(packed))
\ No newline at end of file
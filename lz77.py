@@ -1,59 +1,377 @@
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+try:
+    from . import metrics
+    from .memo_cache import memoized
+except ImportError:
+    import metrics
+    from memo_cache import memoized
+
+# Length of the substrings indexed by the hash chains
+HASH_LENGTH: int = 3
+# Default number of chain links followed per position
+DEFAULT_MAX_CHAIN: int = 256
+# Bytes per block handed to a worker by encode_parallel
+PARALLEL_BLOCK_SIZE: int = 1 << 20
+
+
+def _match_length(data, candidate: int, position: int, limit: int) -> int:
+    """Returns the length of the common prefix of data[candidate:] and data[position:], capped at limit."""
+    length = 0
+    step = 1
+    while length < limit:
+        end = length + step
+        if end > limit:
+            end = limit
+        if data[candidate + length:candidate + end] == data[position + length:position + end]:
+            # Whole slice matched, try a bigger one next time
+            length = end
+            step <<= 1
+        elif step == 1:
+            break
+        else:
+            step >>= 1
+    return length
+
+
+class HashChainMatchFinder:
+    """Finds the longest earlier match for a position using hash chains over the window."""
+
+    def __init__(self, max_window: int, max_chain: Optional[int] = DEFAULT_MAX_CHAIN,
+                 good_length: Optional[int] = None, hash_length: int = HASH_LENGTH):
+        self.max_window: int = max_window
+        self.max_chain: Optional[int] = max_chain  # None follows the whole chain
+        self.good_length: Optional[int] = good_length  # Stop searching once a match is this long
+        self.hash_length: int = hash_length
+        # Most recent position of every hashed substring still in the window
+        self.head: Dict = {}
+        # Previous position with the same hashed substring, indexed by position modulo the window
+        self.prev: array = array('q', [-1]) * max(max_window, 1)
+        # Substring inserted at every position, same indexing, to drop it from the tables as it leaves the window
+        self.grams: list = [None] * max(max_window, 1)
+        # Positions of the shorter substrings, oldest first, so short matches stay exhaustive
+        self.short: list[Dict] = [{} for _ in range(1, hash_length)]
+        self.probes: int = 0  # Hash chain candidates examined by find
+
+    def insert(self, data, position: int, base: int = 0):
+        """Adds data[position:] to the index. Positions must be inserted in increasing order.
+
+        base is the absolute position of data[0], for callers that slide their buffer.
+        """
+        if self.max_window <= 0:
+            return  # find never looks anything up
+        index = position - base
+        gram = data[index:index + self.hash_length]
+        slot = position % len(self.grams)
+        oldest = position + 1 - self.max_window
+
+        # The substring in this slot was inserted a window or more ago, the tables only keep its newer positions
+        expired = self.grams[slot]
+        if expired is not None:
+            if len(expired) == self.hash_length and self.head.get(expired, oldest) < oldest:
+                del self.head[expired]
+            # Deques are oldest first, so the expired position and anything older sit at their left end
+            for length, positions in enumerate(self.short, 1):
+                key = expired[:length]
+                if len(key) < length:
+                    break
+                queue = positions.get(key)
+                if queue is None:
+                    continue
+                while queue and queue[0] < oldest:
+                    queue.popleft()
+                if not queue:
+                    del positions[key]
+        self.grams[slot] = gram
+
+        if len(gram) == self.hash_length:
+            self.prev[slot] = self.head.get(gram, -1)
+            self.head[gram] = position
+        for length, positions in enumerate(self.short, 1):
+            key = gram[:length]
+            if len(key) < length:
+                break
+            queue = positions.get(key)
+            if queue is None:
+                queue = positions[key] = deque()
+            queue.append(position)
+
+    def find(self, data, position: int, limit: int, base: int = 0) -> Tuple[int, int]:
+        """Returns (offset, length) of the longest match for data[position:] inside the window.
+
+        Matches end before position and are at most limit long; ties go to the largest offset.
+        """
+        best_offset = 0
+        best_length = 0
+        if limit <= 0 or self.max_window <= 0:
+            return best_offset, best_length
+
+        index = position - base
+        window_start = max(0, position - self.max_window)
+        good_length = self.good_length
+        if limit >= self.hash_length:
+            candidate = self.head.get(data[index:index + self.hash_length], -1)
+            chain = self.max_chain
+            prev = self.prev
+            prev_size = len(prev)
+            probes = 0
+            while candidate >= window_start:
+                probes += 1
+                cap = position - candidate
+                if cap > limit:
+                    cap = limit
+                # Only candidates sharing the best prefix so far can tie or beat it
+                start = candidate - base
+                if cap >= best_length and data[start:start + best_length] == data[index:index + best_length]:
+                    length = best_length + _match_length(data, start + best_length,
+                                                         index + best_length, cap - best_length)
+                    # Walking from newest to oldest, so >= keeps the oldest of equal matches
+                    if length >= best_length:
+                        best_length = length
+                        best_offset = position - candidate
+                        if good_length is not None and best_length >= good_length:
+                            break
+                if chain is not None and probes >= chain:
+                    break
+                candidate = prev[candidate % prev_size]
+            self.probes += probes
+
+        if best_length < self.hash_length:
+            # The oldest position sharing a short prefix is the best short match
+            for length in range(min(self.hash_length - 1, limit), 0, -1):
+                queue = self.short[length - 1].get(data[index:index + length])
+                if not queue:
+                    continue
+                while queue and queue[0] < window_start:
+                    queue.popleft()
+                if not queue:
+                    continue
+                candidate = queue[0]
+                match = _match_length(data, candidate - base, index, min(limit, position - candidate))
+                if match > best_length or (match == best_length and position - candidate > best_offset):
+                    best_length = match
+                    best_offset = position - candidate
+
+        return best_offset, best_length
+
 
 class LZ77:
-    def __init__(self, max_window: int, max_lookahead_buffer: int):
+    def __init__(self, max_window: int, max_lookahead_buffer: int,
+                 max_chain: Optional[int] = DEFAULT_MAX_CHAIN, good_length: Optional[int] = None):
         self.max_window: int = max_window
         self.max_lookahead_buffer: int = max_lookahead_buffer
+        # Match finder tuning, max_chain=None and good_length=None search exhaustively
+        self.max_chain: Optional[int] = max_chain
+        self.good_length: Optional[int] = good_length
+
+    def match_finder(self) -> HashChainMatchFinder:
+        """Creates a fresh match finder with this encoder's settings."""
+        return HashChainMatchFinder(self.max_window, self.max_chain, self.good_length)
 
     # Python
+    @metrics.timed("lz77.encode")
+    @memoized(parameters=("max_window", "max_lookahead_buffer", "max_chain", "good_length"))
     def encode(self, text: str) -> list[(int, int, str)]:
         """Encodes the input text using LZ77 encoding."""
-        encoded_output = []  # List to store encoded tuples
-        lookahead_pointer: int = 0
+        return self._encode_range(text, 0, len(text))
+
+    @metrics.timed("lz77.encode_parallel")
+    def encode_parallel(self, data: bytes, workers: int = 1, block_size: int = PARALLEL_BLOCK_SIZE,
+                        dictionary: bytes = b"") -> list[Tuple[int, int, bytes]]:
+        """Encodes bytes in blocks on a process pool, each block's window primed with the bytes before it.
 
-        while lookahead_pointer < len(text):
-            # Update the window
-            window_start = max(0, lookahead_pointer - self.max_window)
-            window = text[window_start:lookahead_pointer]
+        The first block is primed with the tail of dictionary, decode(tokens, dictionary) reverses it.
+        Blocks reach the workers through shared memory. With one worker this is encode() with a primed window.
+        """
+        prime = bytes(dictionary[-self.max_window:] if self.max_window > 0 else b"")
+        view = memoryview(data).cast('B')
+        base = len(prime)
+        total = base + len(view)
+        starts = range(base, total, max(block_size, 1))
+        if workers <= 1 or len(starts) <= 1:
+            return self._encode_range(prime + bytes(view), base, total)
 
-            # Update the lookahead buffer
-            lookahead_buffer = text[lookahead_pointer:lookahead_pointer + self.max_lookahead_buffer]
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        memory = shared_memory.SharedMemory(create=True, size=total)
+        try:
+            memory.buf[:base] = prime
+            memory.buf[base:total] = view
+            stops = [min(start + block_size, total) for start in starts]
+            with ProcessPoolExecutor(workers) as executor:
+                parts = executor.map(_encode_shared_block, [memory.name] * len(starts), [self] * len(starts),
+                                     starts, stops, [stop == total for stop in stops])
+                return [token for part in parts for token in part]
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def _encode_range(self, text, start: int, stop: int, final: bool = True) -> list[(int, int, str)]:
+        """Encodes text[start:stop] with text[:start] already in the window.
+
+        Unless final, a match running into stop still leaves a next_char, so the tuples of
+        consecutive ranges can be concatenated.
+        """
+        encoded_output = []  # List to store encoded tuples
+        finder = self.match_finder()
+        for position in range(max(0, start - self.max_window), start):
+            finder.insert(text, position)
+        text_length = stop
+        lookahead_pointer: int = start
+
+        while lookahead_pointer < text_length:
+            lookahead_length = min(self.max_lookahead_buffer, text_length - lookahead_pointer)
 
             # Find the longest match in the window
-            match_length = 0
-            match_offset = 0
-            for i in range(len(window)):
-                length = 0
-                while (length < len(lookahead_buffer) and
-                       i + length < len(window) and
-                       window[i + length] == lookahead_buffer[length]):
-                    length += 1
-                if length > match_length:
-                    match_length = length
-                    match_offset = len(window) - i
+            match_offset, match_length = finder.find(text, lookahead_pointer, lookahead_length)
+
+            # Keep one character back for next_char unless the match reaches the end of the text
+            if match_length and match_length == lookahead_length and \
+                    (lookahead_pointer + match_length < text_length or not final):
+                match_length -= 1
+                if match_length == 0:
+                    match_offset = 0
 
             # Determine the next character after the match
-            next_char = lookahead_buffer[match_length] if match_length < len(lookahead_buffer) else ""
+            next_pointer = lookahead_pointer + match_length
+            next_char = text[next_pointer:next_pointer + 1]
 
             # Append the tuple (offset, length, next_char) to the output
             encoded_output.append((match_offset, match_length, next_char))
 
-            # Move the lookahead pointer forward
-            lookahead_pointer += match_length + 1
+            # Index everything we move past, then move the lookahead pointer forward
+            for position in range(lookahead_pointer, min(next_pointer + 1, text_length)):
+                finder.insert(text, position)
+            lookahead_pointer = next_pointer + 1
 
+        recorder = metrics.active
+        if recorder is not None:
+            recorder.count("lz77.probes", finder.probes)
+            recorder.observe("lz77.match_length", [length for _, length, _ in encoded_output])
         return encoded_output
 
-    def decode(self, encoding: list[(int, int, str)]) -> str:
-        output = ""
-        for i in encoding:
-            offset = i[0]
-            length = i[1]
-            next_char = i[2]
-            for j in range(length):
-                output += output[len(output) - offset + j]
+    @metrics.timed("lz77.decode", argument=None)
+    def decode(self, encoding: list[(int, int, str)], dictionary=None) -> Union[str, bytes]:
+        """Decodes LZ77 tuples back into text. Tuples holding bytes characters decode to bytes.
+
+        dictionary is the data the encoder's window was primed with, see encode_parallel. An empty encoding
+        decodes to "", or to bytes when dictionary is bytes, so bytes callers pass dictionary=b"".
+        """
+        output = bytearray()
+        width = 0  # Bytes per character, picked from the first tuple
+        skip = 0  # Leading bytes of output that belong to the dictionary
+        for offset, length, next_char in encoding:
+            if not width:
+                # str characters are kept as fixed-width UTF-32 so offsets stay a multiple of the width
+                width = 4 if isinstance(next_char, str) else 1
+                if dictionary:
+                    output += dictionary.encode('utf-32-le') if isinstance(dictionary, str) else dictionary
+                    skip = len(output)
+            if length:
+                _copy_match(output, offset * width, length * width)
+            if next_char:
+                output += next_char.encode('utf-32-le') if width == 4 else next_char
+
+        if not width:
+            return "" if dictionary is None or isinstance(dictionary, str) else b""
+        if width == 1:
+            return bytes(output[skip:])
+        return output[skip:].decode('utf-32-le')
+
+
+    def encode_stream(self, reader, chunk_size: int = 1 << 16) -> Iterator[Tuple[int, int, bytes]]:
+        """Yields LZ77 tuples for a binary file object or mmap, reading it chunk_size bytes at a time.
+
+        Only the window and lookahead buffer are kept in memory. The tuples match encode() on the same bytes.
+        """
+        finder = self.match_finder()
+        # Bytes needed past the lookahead pointer: the lookahead, next_char and a full hash for the last insert
+        wanted = self.max_lookahead_buffer + finder.hash_length
+        buffer = b""
+        base = 0  # Absolute position of buffer[0]
+        lookahead_pointer = 0
+        end_of_input = False
+
+        while True:
+            # Refill the lookahead, dropping everything that has left the window
+            while not end_of_input and base + len(buffer) - lookahead_pointer < wanted:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    end_of_input = True
+                    break
+                trim = max(0, lookahead_pointer - self.max_window - base)
+                buffer = buffer[trim:] + bytes(chunk)
+                base += trim
+
+            data_end = base + len(buffer)
+            if lookahead_pointer >= data_end:
+                return
+            lookahead_length = min(self.max_lookahead_buffer, data_end - lookahead_pointer)
+
+            match_offset, match_length = finder.find(buffer, lookahead_pointer, lookahead_length, base)
+            if match_length and match_length == lookahead_length and lookahead_pointer + match_length < data_end:
+                match_length -= 1
+                if match_length == 0:
+                    match_offset = 0
+
+            next_pointer = lookahead_pointer + match_length
+            next_char = buffer[next_pointer - base:next_pointer - base + 1]
+            yield match_offset, match_length, next_char
+
+            for position in range(lookahead_pointer, min(next_pointer + 1, data_end)):
+                finder.insert(buffer, position, base)
+            lookahead_pointer = next_pointer + 1
+
+    def decode_stream(self, encoding: Iterable[Tuple[int, int, bytes]], writer,
+                      flush_size: int = 1 << 16) -> int:
+        """Decodes bytes LZ77 tuples into a binary file object and returns the number of bytes written.
+
+        Only the last max_window bytes are kept, so the tuples must come from an encoder with the same window.
+        """
+        output = bytearray()
+        written = 0
+        for offset, length, next_char in encoding:
+            if length:
+                _copy_match(output, offset, length)
+            if next_char:
+                output += next_char
+            if len(output) >= self.max_window + flush_size:
+                cut = len(output) - self.max_window
+                writer.write(output[:cut])
+                del output[:cut]
+                written += cut
+
+        writer.write(output)
+        return written + len(output)
+
+def _encode_shared_block(name: str, lz77: LZ77, start: int, stop: int, final: bool) -> list[Tuple[int, int, bytes]]:
+    # Copies its block and the window before it out of shared memory, then encodes the block
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        prime_start = max(0, start - lz77.max_window)
+        block = bytes(memory.buf[prime_start:stop])
+    finally:
+        memory.close()
+    return lz77._encode_range(block, start - prime_start, len(block), final)
+
+
+def _copy_match(output: bytearray, offset: int, length: int):
+    """Appends length bytes copied from offset bytes back, repeating the source when it overlaps."""
+    start = len(output) - offset
+    if offset <= 0 or start < 0:
+        raise ValueError("Match offset must point inside the decoded output")
+    if offset >= length:
+        output += output[start:start + length]
+    else:
+        # The match runs into itself, so it is the last offset bytes repeated
+        pattern = output[start:]
+        repeats, remainder = divmod(length, offset)
+        output += pattern * repeats + pattern[:remainder]
 
-            output += next_char
 
-        return output
 if __name__ == "__main__":
     lz77 = LZ77(6, 4)
     text = "aacaacabcabaaac"
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import pickle
+import threading
+from array import array
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional, Tuple
+
+# Cache used by the @memoized codec entry points, None leaves them uncached
+_active = None
+_MISSING = object()
+
+
+class ContentCache:
+    """LRU cache keyed by content hashes and bounded by the pickled size of its values.
+
+    Values are kept pickled and every get unpickles a fresh copy, so callers never share mutable state.
+    With spill_dir set, values evicted from memory are written there and found again on a later get.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, spill_dir: Optional[str] = None):
+        self.max_bytes: int = max_bytes
+        self.spill_dir: Optional[str] = spill_dir
+        self.entries: OrderedDict = OrderedDict()  # key -> pickled value, oldest first
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._lock = threading.Lock()
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def key(content, *parameters) -> str:
+        """Hash of content and parameters, str, bytes-like and array content never collide with each other."""
+        digest = hashlib.blake2b(repr(parameters).encode(), digest_size=20)
+        if isinstance(content, str):
+            digest.update(b"s")
+            digest.update(content.encode('utf-8', 'surrogatepass'))
+        elif isinstance(content, array):
+            digest.update(b"a" + content.typecode.encode())
+            digest.update(content)
+        else:
+            try:
+                view = memoryview(content).cast('B')
+            except TypeError:
+                digest.update(b"p")
+                digest.update(pickle.dumps(content, pickle.HIGHEST_PROTOCOL))
+            else:
+                digest.update(b"b")
+                digest.update(view)
+        return digest.hexdigest()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        if data is not None:
+            return pickle.loads(data)
+        path = self._spill_path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = file.read()
+            with self._lock:
+                self.disk_hits += 1
+            # Like put, a value too big for memory stays on disk only instead of emptying the LRU
+            if len(data) <= self.max_bytes:
+                self._store(key, data)
+            return pickle.loads(data)
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: str, value):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            # Too big to ever stay in memory
+            self._spill(key, data)
+            return
+        self._store(key, data)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "entries": len(self.entries), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes}
+
+    def clear(self):
+        """Empties the memory cache and the spill directory, the statistics are kept."""
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+        if self.spill_dir is not None:
+            for name in os.listdir(self.spill_dir):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.spill_dir, name))
+
+    def memoize(self, parameters: Tuple[str, ...] = (), state: Tuple[str, ...] = (), content: Optional[str] = None):
+        """Decorator for methods whose result depends only on their content and the attributes in parameters.
+
+        The content is the first argument, or the attribute named by content. Attributes named in state
+        are set by the method, they are stored with the result and restored on a hit.
+        """
+        def decorator(method):
+            name = method.__qualname__
+
+            @wraps(method)
+            def wrapper(instance, *args, **kwargs):
+                return _cached_call(self, name, parameters, state, content, method, instance, args, kwargs)
+            return wrapper
+        return decorator
+
+    def _store(self, key: str, data: bytes):
+        evicted = []
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self.entries[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                evicted_key, evicted_data = self.entries.popitem(last=False)
+                self.bytes -= len(evicted_data)
+                self.evictions += 1
+                evicted.append((evicted_key, evicted_data))
+        if self.spill_dir is not None:
+            for evicted_key, evicted_data in evicted:
+                self._spill(evicted_key, evicted_data)
+
+    def _spill(self, key: str, data: bytes):
+        path = self._spill_path(key)
+        if path is None or os.path.exists(path):
+            return
+        # Written under a temporary name so a reader never sees half a file
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    def _spill_path(self, key: str) -> Optional[str]:
+        if self.spill_dir is None:
+            return None
+        return os.path.join(self.spill_dir, key + ".pickle")
+
+
+def _cached_call(cache: ContentCache, name: str, parameters, state, content, method, instance, args, kwargs):
+    data = getattr(instance, content) if content is not None else args[0]
+    key = cache.key(data, name, *(getattr(instance, attribute) for attribute in parameters))
+    entry = cache.get(key, _MISSING)
+    if entry is _MISSING:
+        result = method(instance, *args, **kwargs)
+        cache.put(key, (result, tuple(getattr(instance, attribute) for attribute in state)))
+        return result
+    result, saved = entry
+    for attribute, value in zip(state, saved):
+        setattr(instance, attribute, value)
+    return result
+
+
+def set_cache(cache: Optional[ContentCache]) -> Optional[ContentCache]:
+    """Makes cache the one used by the codec entry points, None turns caching off. Returns the previous one."""
+    global _active
+    previous, _active = _active, cache
+    return previous
+
+
+def get_cache() -> Optional[ContentCache]:
+    return _active
+
+
+def memoized(parameters: Tuple[str, ...] = (), state: Tuple[str, ...] = (), content: Optional[str] = None):
+    """Like ContentCache.memoize, against the cache given to set_cache. Without one the method runs directly."""
+    def decorator(method):
+        name = method.__qualname__
+
+        @wraps(method)
+        def wrapper(instance, *args, **kwargs):
+            cache = _active
+            if cache is None:
+                return method(instance, *args, **kwargs)
+            return _cached_call(cache, name, parameters, state, content, method, instance, args, kwargs)
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    cache = ContentCache(max_bytes=1 << 20)
+
+    class Squares:
+        def __init__(self, offset: int):
+            self.offset = offset
+
+        @cache.memoize(parameters=("offset",))
+        def apply(self, data: bytes) -> list[int]:
+            return [value * value + self.offset for value in data]
+
+    print(Squares(1).apply(b"abc"), Squares(1).apply(b"abc"), Squares(2).apply(b"abc"))
+    print(cache.stats())
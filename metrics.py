@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+from typing import Callable, Iterable, Optional
+
+# Recorder the instrumented code reports to, None (the default) skips all of it
+active = None
+
+
+class Metrics:
+    """Counters, histograms, maxima, timers and per-call totals reported by the codecs while enabled.
+
+    callback, when given, is called as callback(name, event) after every timed codec call,
+    event holding that call's bytes and seconds.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, dict], None]] = None):
+        self.callback = callback
+        self.counters: Counter = Counter()
+        self.histograms: defaultdict = defaultdict(Counter)
+        self.maxima: dict = {}
+        self.timers: Counter = Counter()  # Seconds spent in named phases
+        self.calls: dict = {}  # name -> [calls, bytes, seconds]
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name: str, values: Iterable[int]):
+        """Adds every value to the histogram name."""
+        histogram = Counter(values)
+        with self._lock:
+            self.histograms[name].update(histogram)
+
+    def maximum(self, name: str, value):
+        with self._lock:
+            if name not in self.maxima or value > self.maxima[name]:
+                self.maxima[name] = value
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            self.timers[name] += seconds
+
+    def record_call(self, name: str, size: int, seconds: float):
+        with self._lock:
+            totals = self.calls.setdefault(name, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += seconds
+        if self.callback is not None:
+            self.callback(name, {"bytes": size, "seconds": seconds})
+
+    def snapshot(self) -> dict:
+        """Copy of everything recorded so far as plain dicts."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: dict(sorted(histogram.items())) for name, histogram in self.histograms.items()},
+                "maxima": dict(self.maxima),
+                "timers": dict(self.timers),
+                "calls": {name: {"calls": calls, "bytes": size, "seconds": seconds}
+                          for name, (calls, size, seconds) in self.calls.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.maxima.clear()
+            self.timers.clear()
+            self.calls.clear()
+
+
+def enable(callback: Optional[Callable[[str, dict], None]] = None) -> Metrics:
+    """Starts recording into a new Metrics and returns it."""
+    global active
+    active = Metrics(callback)
+    return active
+
+
+def disable() -> Optional[Metrics]:
+    """Stops recording, returns the Metrics that was active."""
+    global active
+    previous, active = active, None
+    return previous
+
+
+def snapshot() -> dict:
+    return active.snapshot() if active is not None else {}
+
+
+def timed(name: str, argument: Optional[int] = 1):
+    """Decorator recording time and bytes of every call while metrics are enabled.
+
+    Bytes are the len() of the positional argument at index argument (1 skips self), or of the result for None.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = active
+            if recorder is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            try:
+                size = len(result if argument is None else args[argument])
+            except (TypeError, IndexError):
+                size = 0
+            recorder.record_call(name, size, seconds)
+            return result
+        return wrapper
+    return decorator
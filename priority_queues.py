@@ -0,0 +1,241 @@
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Tuple
+
+try:
+    from .fibonacci_heap import CompactFibonacciHeap, FibonacciHeap
+except ImportError:
+    from fibonacci_heap import CompactFibonacciHeap, FibonacciHeap
+
+# Addressable priority queues share the FibonacciHeap interface:
+#   push(key, value) -> handle, pop() -> (key, value), decrease_key(handle, key) and len()
+# Handles expose .key and .value and stay valid until their entry is popped,
+# except CompactFibonacciHeap's int handles, read through its entry(handle).
+
+
+class PairingNode:
+    __slots__ = ('key', 'value', 'child', 'sibling', 'prev')
+
+    def __init__(self, key, value=None):
+        self.key = key
+        self.value = value
+        self.child: PairingNode = None
+        self.sibling: PairingNode = None
+        self.prev: PairingNode = None  # Parent for a first child, left sibling otherwise
+
+
+class PairingHeap:
+    """Pairing heap with two-pass pop, decrease_key cuts the subtree and melds it back at the root."""
+
+    def __init__(self):
+        self.root: PairingNode = None
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key, value=None) -> PairingNode:
+        node = PairingNode(key, value)
+        self.root = node if self.root is None else self._meld(self.root, node)
+        self.size += 1
+        return node
+
+    def peek(self):
+        if self.root is None:
+            return None
+        return self.root.key, self.root.value
+
+    def pop(self) -> Tuple[Any, Any]:
+        root = self.root
+        if root is None:
+            raise IndexError("pop from an empty heap")
+        self.root = self._merge_pairs(root.child)
+        root.child = None
+        self.size -= 1
+        return root.key, root.value
+
+    def decrease_key(self, node: PairingNode, new_key):
+        if new_key > node.key:
+            raise ValueError("New key must be smaller than the current key.")
+        node.key = new_key
+        if node is self.root:
+            return
+        # Unlink the subtree from its sibling list
+        prev = node.prev
+        sibling = node.sibling
+        if prev.child is node:
+            prev.child = sibling
+        else:
+            prev.sibling = sibling
+        if sibling is not None:
+            sibling.prev = prev
+        node.prev = node.sibling = None
+        self.root = self._meld(self.root, node)
+
+    @staticmethod
+    def _meld(first: PairingNode, second: PairingNode) -> PairingNode:
+        # Both are detached roots, the larger one becomes the first child of the smaller
+        if second.key < first.key:
+            first, second = second, first
+        child = first.child
+        second.sibling = child
+        if child is not None:
+            child.prev = second
+        second.prev = first
+        first.child = second
+        return first
+
+    def _merge_pairs(self, node: PairingNode) -> PairingNode:
+        # First pass melds neighbours left to right, second pass melds the results right to left
+        if node is None:
+            return None
+        meld = self._meld
+        pairs = []
+        while node is not None:
+            first = node
+            second = first.sibling
+            first.prev = None
+            if second is None:
+                pairs.append(first)
+                break
+            node = second.sibling
+            first.sibling = second.prev = second.sibling = None
+            pairs.append(meld(first, second))
+        root = pairs.pop()
+        while pairs:
+            root = meld(pairs.pop(), root)
+        return root
+
+
+class RadixNode:
+    __slots__ = ('key', 'value', 'bucket')
+
+    def __init__(self, key: int, value=None):
+        self.key: int = key
+        self.value = value
+        self.bucket: int = 0
+
+
+class RadixHeap:
+    """Monotone queue for non-negative int keys, no key may be below the last popped one.
+
+    Bucket i holds the keys whose highest bit differing from the last popped key is bit i - 1,
+    so every key moves down at most once per bit. Fits Dijkstra with int weights, not Prim.
+    """
+
+    def __init__(self):
+        self.buckets: list[dict] = [{}]
+        self.last: int = 0  # Last popped key
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key: int, value=None) -> RadixNode:
+        if key < self.last:
+            raise ValueError("Radix heap keys must not be smaller than the last popped key")
+        node = RadixNode(key, value)
+        self._place(node)
+        self.size += 1
+        return node
+
+    def pop(self) -> Tuple[int, Any]:
+        if not self.size:
+            raise IndexError("pop from an empty heap")
+        buckets = self.buckets
+        if not buckets[0]:
+            # Move the last popped key up to the smallest key of the first non-empty bucket and spread it
+            index = 1
+            while not buckets[index]:
+                index += 1
+            bucket = buckets[index]
+            buckets[index] = {}
+            self.last = min(node.key for node in bucket)
+            for node in bucket:
+                self._place(node)
+        node = buckets[0].popitem()[0]
+        self.size -= 1
+        return node.key, node.value
+
+    def decrease_key(self, node: RadixNode, new_key: int):
+        if new_key > node.key:
+            raise ValueError("New key must be smaller than the current key.")
+        if new_key < self.last:
+            raise ValueError("Radix heap keys must not be smaller than the last popped key")
+        del self.buckets[node.bucket][node]
+        node.key = new_key
+        self._place(node)
+
+    def _place(self, node: RadixNode):
+        index = (node.key ^ self.last).bit_length()
+        buckets = self.buckets
+        while len(buckets) <= index:
+            buckets.append({})
+        buckets[index][node] = None
+        node.bucket = index
+
+
+class LazyHandle:
+    __slots__ = ('key', 'value', 'entry')
+
+    def __init__(self, key, value=None):
+        self.key = key
+        self.value = value
+        self.entry: list = None  # Live heap entry, None once popped
+
+
+class LazyHeap:
+    """heapq baseline: decrease_key pushes a new entry and pop skips the stale ones."""
+
+    def __init__(self):
+        self.heap: list = []
+        self.size: int = 0
+        self._counter = count()  # Tie breaker, handles do not compare
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key, value=None) -> LazyHandle:
+        handle = LazyHandle(key, value)
+        handle.entry = [key, next(self._counter), handle]
+        heappush(self.heap, handle.entry)
+        self.size += 1
+        return handle
+
+    def pop(self) -> Tuple[Any, Any]:
+        heap = self.heap
+        while heap:
+            entry = heappop(heap)
+            handle = entry[2]
+            if handle.entry is entry:
+                handle.entry = None
+                self.size -= 1
+                return handle.key, handle.value
+        raise IndexError("pop from an empty heap")
+
+    def decrease_key(self, handle: LazyHandle, new_key):
+        if new_key > handle.key:
+            raise ValueError("New key must be smaller than the current key.")
+        handle.key = new_key
+        handle.entry = [new_key, next(self._counter), handle]
+        heappush(self.heap, handle.entry)
+
+
+# Backends by name, every value is a zero argument constructor
+QUEUES: dict = {
+    "fibonacci": FibonacciHeap,
+    "fibonacci_compact": CompactFibonacciHeap,
+    "pairing": PairingHeap,
+    "radix": RadixHeap,
+    "heapq": LazyHeap,
+}
+
+
+def make_queue(queue="fibonacci"):
+    """Builds a queue from a QUEUES name or a zero argument callable."""
+    if callable(queue):
+        return queue()
+    try:
+        return QUEUES[queue]()
+    except KeyError:
+        raise ValueError(f"Unknown queue {queue!r}, expected one of {sorted(QUEUES)}") from None
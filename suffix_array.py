@@ -0,0 +1,164 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Inputs shorter than this are sorted directly
+NAIVE_THRESHOLD: int = 10
+
+
+def build_suffix_array(text, method: str = "sais") -> array:
+    """Returns the suffix array of a str or bytes text as an array('i').
+
+    A suffix that is a prefix of another one sorts first, as if the text ended with a unique smallest sentinel.
+    method is "sais" (linear time, pure Python) or "doubling" (prefix doubling, needs NumPy).
+    """
+    if isinstance(text, str):
+        # Map characters to dense ranks so the buckets stay small
+        alphabet = {char: rank for rank, char in enumerate(sorted(set(text)))}
+        symbols = array('i', map(alphabet.__getitem__, text))
+        upper = max(len(alphabet) - 1, 0)
+    else:
+        symbols = memoryview(text).cast('B')
+        upper = 255
+
+    if method == "sais":
+        return _sa_is(symbols, upper)
+    if method == "doubling":
+        if np is None:
+            raise ImportError("Prefix doubling needs NumPy")
+        return _prefix_doubling(symbols)
+    raise ValueError(f"Unknown suffix array method {method!r}")
+
+
+def _sa_is(s, upper: int) -> array:
+    """SA-IS over a sequence of ints in [0, upper]."""
+    n = len(s)
+    if n < NAIVE_THRESHOLD:
+        return array('i', sorted(range(n), key=lambda i: list(s[i:])))
+
+    sa = array('i', [-1]) * n
+    # ls[i] is 1 when suffix i is smaller than suffix i + 1 (S-type)
+    ls = bytearray(n)
+    for i in range(n - 2, -1, -1):
+        ls[i] = ls[i + 1] if s[i] == s[i + 1] else s[i] < s[i + 1]
+
+    # Bucket starts for the L-type and S-type suffixes of every symbol
+    sum_l = [0] * (upper + 1)
+    sum_s = [0] * (upper + 1)
+    for i in range(n):
+        if not ls[i]:
+            sum_s[s[i]] += 1
+        else:
+            sum_l[s[i] + 1] += 1
+    for i in range(upper + 1):
+        sum_s[i] += sum_l[i]
+        if i < upper:
+            sum_l[i + 1] += sum_s[i]
+
+    def induce(lms):
+        for i in range(n):
+            sa[i] = -1
+        buffer = sum_s[:]
+        for d in lms:
+            if d == n:
+                continue
+            sa[buffer[s[d]]] = d
+            buffer[s[d]] += 1
+        buffer = sum_l[:]
+        sa[buffer[s[n - 1]]] = n - 1
+        buffer[s[n - 1]] += 1
+        for i in range(n):
+            v = sa[i]
+            if v >= 1 and not ls[v - 1]:
+                char = s[v - 1]
+                sa[buffer[char]] = v - 1
+                buffer[char] += 1
+        buffer = sum_l[:]
+        for i in range(n - 1, -1, -1):
+            v = sa[i]
+            if v >= 1 and ls[v - 1]:
+                char = s[v - 1] + 1
+                buffer[char] -= 1
+                sa[buffer[char]] = v - 1
+
+    # Leftmost S-type positions split the text into LMS substrings
+    lms_map = array('i', [-1]) * (n + 1)
+    lms = array('i')
+    for i in range(1, n):
+        if not ls[i - 1] and ls[i]:
+            lms_map[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+
+    induce(lms)
+
+    if m:
+        # Name the sorted LMS substrings and sort them recursively
+        sorted_lms = array('i', (v for v in sa if lms_map[v] != -1))
+        rec_s = array('i', [0]) * m
+        rec_upper = 0
+        for i in range(1, m):
+            left = sorted_lms[i - 1]
+            right = sorted_lms[i]
+            end_left = lms[lms_map[left] + 1] if lms_map[left] + 1 < m else n
+            end_right = lms[lms_map[right] + 1] if lms_map[right] + 1 < m else n
+            same = True
+            if end_left - left != end_right - right:
+                same = False
+            else:
+                while left < end_left:
+                    if s[left] != s[right]:
+                        break
+                    left += 1
+                    right += 1
+                if left == n or s[left] != s[right]:
+                    same = False
+            if not same:
+                rec_upper += 1
+            rec_s[lms_map[sorted_lms[i]]] = rec_upper
+
+        rec_sa = _sa_is(rec_s, rec_upper)
+        for i in range(m):
+            sorted_lms[i] = lms[rec_sa[i]]
+        induce(sorted_lms)
+
+    return sa
+
+
+def _prefix_doubling(s) -> array:
+    """Prefix doubling with NumPy sorts, O(n log^2 n) but every pass runs in C."""
+    n = len(s)
+    if n == 0:
+        return array('i')
+    # Rank 0 is reserved for positions past the end of the text
+    rank = np.asarray(s, dtype=np.int64) + 1
+    step = 1
+    while True:
+        second = np.zeros(n, dtype=np.int64)
+        second[:n - step] = rank[step:]
+        # Pairs are encoded in one int, the multiplier must exceed every rank (bytes start at up to 256)
+        key = rank * (int(rank.max()) + 1) + second
+        order = np.argsort(key, kind='stable')
+        sorted_key = key[order]
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.cumsum(np.concatenate(([1], sorted_key[1:] != sorted_key[:-1])))
+        if rank[order[-1]] == n or step >= n:
+            return array('i', order.astype(np.int32).tobytes())
+        step <<= 1
+
+
+if __name__ == "__main__":
+    print(list(build_suffix_array("banana")))
+    print(list(build_suffix_array(b"mississippi")))
+    if np is not None:
+        # Short bytes inputs, where byte values exceed the text length, against SA-IS
+        import random
+        rng = random.Random(0)
+        for size in (1, 2, 5, 20, 47, 60, 300):
+            for alphabet in (b"ab", b"\x00\xff", bytes(range(256))):
+                text = bytes(rng.choice(alphabet) for _ in range(size))
+                assert build_suffix_array(text, "doubling") == build_suffix_array(text), text
+        print("doubling matches SA-IS")
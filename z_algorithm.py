@@ -1,3 +1,186 @@
+import mmap
+from array import array
+from collections import deque
+from typing import Iterable, Iterator, Tuple
+
+
+class CompiledPattern:
+    """A pattern preprocessed once, it scans any number of texts with the pattern's Z array alone."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.z_array: array = array('i', ZAlgorithm().calculate_z_array(pattern))
+        if pattern:
+            self.z_array[0] = len(pattern)
+
+    def finditer(self, text) -> Iterator[int]:
+        """Yields the start of every occurrence of the pattern in text, overlapping ones included."""
+        pattern = self.pattern
+        m = len(pattern)
+        n = len(text)
+        if not m:
+            yield from range(n + 1)
+            return
+        if isinstance(pattern, str) != isinstance(text, str):
+            raise TypeError("Pattern and text must both be str or both be bytes")
+
+        z = self.z_array
+        first = pattern[:1]
+        # text[left:right] is the rightmost known match of a pattern prefix
+        left = right = 0
+        i = 0
+        while i <= n - m:
+            if i < right:
+                # Inside the box the pattern's own Z values say how far the match already goes
+                length = z[i - left]
+                if length < right - i:
+                    i += 1
+                    continue
+                length = right - i
+            else:
+                # Outside any box, jump straight to the next place the first character appears
+                i = text.find(first, i)
+                if i < 0 or i > n - m:
+                    return
+                length = 1
+            while length < m and text[i + length] == pattern[length]:
+                length += 1
+            if i + length > right:
+                left, right = i, i + length
+            if length == m:
+                yield i
+            i += 1
+
+    def findall(self, text) -> list[int]:
+        """Returns the start of every occurrence of the pattern in text."""
+        return list(self.finditer(text))
+
+    def finditer_stream(self, reader, chunk_size: int = 1 << 20) -> Iterator[int]:
+        """Yields absolute match offsets in a binary file object read chunk_size bytes at a time.
+
+        The last len(pattern) - 1 bytes of every chunk are carried over, so matches across chunks are found once.
+        """
+        overlap = len(self.pattern) - 1
+        tail = b""
+        base = 0  # Absolute offset of tail[0]
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                return
+            buffer = tail + chunk
+            for position in self.finditer(buffer):
+                yield base + position
+            keep = min(overlap, len(buffer))
+            tail = buffer[len(buffer) - keep:]
+            base += len(buffer) - keep
+
+    def search_file(self, path: str, chunk_size: int = 1 << 20, use_mmap: bool = True) -> Iterator[int]:
+        """Yields absolute match offsets in a file, through mmap or fixed-size reads."""
+        with open(path, 'rb') as file:
+            if use_mmap and file.seek(0, 2):
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    # mmap has find() and integer indexing, so it is scanned in place
+                    yield from self.finditer(mapped)
+                return
+            file.seek(0)
+            yield from self.finditer_stream(file, chunk_size)
+
+
+class MultiPatternMatcher:
+    """Aho-Corasick automaton that finds every pattern of a set in one pass over the text."""
+
+    def __init__(self, patterns: Iterable):
+        self.patterns: list = list(dict.fromkeys(patterns))  # Unique, in first seen order
+        if any(not pattern for pattern in self.patterns):
+            raise ValueError("Patterns must not be empty")
+        self.max_length: int = max(map(len, self.patterns), default=0)
+
+        # Trie over the patterns, state 0 is the root
+        self.goto: list[dict] = [{}]
+        self.outputs: list[list[int]] = [[]]  # Pattern indexes ending at each state
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                following = self.goto[state].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][char] = following
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = following
+            self.outputs[state].append(index)
+
+        # Failure links in breadth-first order, each state inherits the outputs of its failure state
+        self.fail: array = array('i', [0]) * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[following] = target if target != following else 0
+                self.outputs[following] = self.outputs[following] + self.outputs[self.fail[following]]
+
+    def finditer(self, text, start: int = 0, stop: int = None) -> Iterator[Tuple[int, object]]:
+        """Yields (position, pattern) for every match starting in text[start:stop], in end position order."""
+        if stop is None:
+            stop = len(text)
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        patterns = self.patterns
+        # Matches starting before stop may run up to max_length - 1 characters past it
+        end = min(len(text), stop + self.max_length - 1)
+        state = 0
+        for i in range(start, end):
+            char = text[i]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in outputs[state]:
+                position = i - len(patterns[index]) + 1
+                if position < stop:
+                    yield position, patterns[index]
+
+    def search(self, text, workers: int = 1, shard_size: int = 1 << 22) -> dict:
+        """Maps every pattern to its sorted match positions, like pattern_matching per pattern.
+
+        With workers > 1 the text is cut into shard_size shards that are searched in a process pool,
+        each shard reading max_length - 1 characters into the next one.
+        """
+        if workers <= 1 or len(text) <= shard_size:
+            shards = [_search_shard(self, text, 0, len(text))]
+        else:
+            starts = range(0, len(text), shard_size)
+            # Each worker gets its shard plus the overlap, not the whole text
+            pieces = [text[start:start + shard_size + self.max_length - 1] for start in starts]
+            stops = [min(shard_size, len(text) - start) for start in starts]
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(workers) as executor:
+                found = executor.map(_search_shard, [self] * len(pieces), pieces, [0] * len(pieces), stops)
+                shards = [{pattern: [start + position for position in positions]
+                           for pattern, positions in matches.items()}
+                          for start, matches in zip(starts, found)]
+
+        result = {pattern: [] for pattern in self.patterns}
+        for matches in shards:
+            for pattern, positions in matches.items():
+                result[pattern].extend(positions)
+        return result
+
+
+def _search_shard(matcher: MultiPatternMatcher, text, start: int, stop: int) -> dict:
+    matches = {}
+    for position, pattern in matcher.finditer(text, start, stop):
+        matches.setdefault(pattern, []).append(position)
+    for positions in matches.values():
+        positions.sort()
+    return matches
+
+
 class ZAlgorithm:
     def __init__(self):
         self.text = ""
@@ -24,15 +207,17 @@ class ZAlgorithm:
 
     def pattern_matching(self, text: str, pattern: str) -> list[int]:
         """Finds all occurrences of pattern in text."""
-        concat = pattern + "$" + text
-        z = self.calculate_z_array(concat)
-        matches = []
+        return ZAlgorithm.compile(pattern).findall(text)
 
-        for i in range(len(concat)):
-            if z[i] == len(pattern):
-                matches.append(i - len(pattern) - 1)
+    @staticmethod
+    def batch_pattern_matching(text, patterns: Iterable, workers: int = 1) -> dict:
+        """Finds all occurrences of every pattern in one pass, as {pattern: pattern_matching(text, pattern)}."""
+        return MultiPatternMatcher(patterns).search(text, workers)
 
-        return matches
+    @staticmethod
+    def compile(pattern) -> CompiledPattern:
+        """Preprocesses a str or bytes pattern for repeated searches, like re.compile."""
+        return CompiledPattern(pattern)
 
 if __name__ == "__main__":
     text = "abcabcabacbabacbabccc"
@@ -41,4 +226,10 @@ if __name__ == "__main__":
 
     print(z_class.calculate_z_array(text))
 
-    print(z_class.pattern_matching(text, pat))
\ No newline at end of file
+    print(z_class.pattern_matching(text, pat))
+
+    compiled = ZAlgorithm.compile(pat)
+    for line in ["abab", "ba$ba", "nothing here"]:
+        print(line, compiled.findall(line))
+
+    print(ZAlgorithm.batch_pattern_matching(text, ["ba", "abc", "ccc", "cb"]))
\ No newline at end of file